@@ -0,0 +1,82 @@
+"""Count the polls per area per day before any publish window is learned.
+
+Run from the repository root, with Home Assistant installed:
+
+    python benchmarks/bench_poll_schedule.py [days]
+
+Before the schedule, every account polled EVN at DEFAULT_SCAN_INTERVAL.
+Now polls follow the publish window of each area, but while the window
+is still unknown they must not be denser than the fixed interval was.
+Each simulated area publishes yesterday's reading at its own time of day,
+the schedule is never told about it so no window is learned.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "custom_components"))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+from nestup_evn.const import DEFAULT_SCAN_INTERVAL  # noqa: E402
+from nestup_evn.schedule import (  # noqa: E402
+    PublishSchedule,
+    staggered_interval,
+    startup_delay,
+)
+
+# Time of day each simulated area publishes yesterday's reading
+PUBLISH_TIMES = {
+    "EVNHANOI": timedelta(hours=6, minutes=10),
+    "EVNHCMC": timedelta(hours=9, minutes=45),
+    "EVNNPC": timedelta(hours=14),
+    "EVNCPC": timedelta(hours=2, minutes=30),
+    "EVNSPC": timedelta(hours=20, minutes=5),
+}
+START = datetime(2024, 1, 1)
+
+
+def simulate(schedule: PublishSchedule, area_name: str, days: int) -> list[int]:
+    """Return the number of polls of an area on each simulated day."""
+
+    polls = [0] * days
+    now = START + timedelta(seconds=startup_delay(area_name))
+
+    while (day := (now - START).days) < days:
+        polls[day] += 1
+
+        published = now - now.replace(hour=0, minute=0) >= PUBLISH_TIMES[area_name]
+        latest = now.date() - timedelta(days=1 if published else 2)
+
+        now += staggered_interval(
+            area_name, schedule.next_interval(area_name, latest, now), now
+        )
+
+    return polls
+
+
+async def measure(days: int) -> None:
+    with tempfile.TemporaryDirectory() as config_dir:
+        schedule = PublishSchedule(HomeAssistant(config_dir))
+
+        fixed = timedelta(days=1) / DEFAULT_SCAN_INTERVAL
+        print(f"{days} days, {fixed:.0f} polls per day at the fixed interval")
+
+        for area_name in PUBLISH_TIMES:
+            if schedule.window(area_name) is not None:
+                raise SystemExit(f"A publish window of {area_name} is known")
+
+            polls = simulate(schedule, area_name, days)
+            print(
+                f"  {area_name + ':':<10} {sum(polls) / days:5.2f} polls per day, "
+                f"{max(polls)} at most"
+            )
+
+            if sum(polls) / days > fixed:
+                raise SystemExit(f"{area_name} polls more often than before")
+
+
+if __name__ == "__main__":
+    asyncio.run(measure(int(sys.argv[1]) if len(sys.argv) > 1 else 30))
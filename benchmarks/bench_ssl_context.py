@@ -0,0 +1,112 @@
+"""Benchmark SSL context creation per poll against the cached contexts.
+
+Run from the repository root, with Home Assistant installed:
+
+    python benchmarks/bench_ssl_context.py [polls]
+
+Before the cache, every poll built its SSL contexts in an executor job,
+loading the CA bundle from disk each time. Now each context, the default
+one and the SECLEVEL=1 one of the EVNHCMC and EVNNPC logins, is built
+once and later polls only look it up. Both runs go through
+session.async_get_ssl_context, the uncached one empties the cache before
+every lookup.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "custom_components"))
+
+from nestup_evn import session  # noqa: E402
+
+# SSL contexts needed by one poll of each area, True for the SECLEVEL=1 one
+CONTEXTS_PER_POLL = {
+    "EVNHANOI": (False,),
+    "EVNHCMC": (False,),
+    "EVNNPC": (False,),
+    "EVNCPC": (),
+    "EVNSPC": (),
+}
+# A login adds the SECLEVEL=1 context for EVNHCMC and EVNNPC
+CONTEXTS_PER_LOGIN = {
+    "EVNHCMC": (True,),
+    "EVNNPC": (True,),
+}
+LOGIN_EVERY = 4  # polls
+
+
+class CountingHass:
+    """Run executor jobs on the running loop, counting them"""
+
+    def __init__(self, loop) -> None:
+        self._loop = loop
+        self.jobs = 0
+
+    def async_add_executor_job(self, target, *args):
+        self.jobs += 1
+        return self._loop.run_in_executor(None, target, *args)
+
+
+def contexts(poll: int) -> list[bool]:
+    """Return the SSL contexts needed by one poll of every area."""
+
+    needed = [legacy for hops in CONTEXTS_PER_POLL.values() for legacy in hops]
+
+    if poll % LOGIN_EVERY == 0:
+        needed += [legacy for hops in CONTEXTS_PER_LOGIN.values() for legacy in hops]
+
+    return needed
+
+
+async def poll_uncached(hass, poll):
+    for legacy in contexts(poll):
+        session._SSL_CONTEXTS.clear()
+        await session.async_get_ssl_context(hass, legacy)
+
+
+async def poll_cached(hass, poll):
+    for legacy in contexts(poll):
+        await session.async_get_ssl_context(hass, legacy)
+
+
+async def measure(polls: int) -> None:
+    running = asyncio.get_running_loop()
+
+    # Warm up the executor so thread start-up is not measured
+    await running.run_in_executor(None, session.create_ssl_context)
+
+    hass = CountingHass(running)
+    wall, cpu = time.perf_counter(), time.process_time()
+    for poll in range(polls):
+        await poll_uncached(hass, poll)
+    uncached = (hass.jobs, time.perf_counter() - wall, time.process_time() - cpu)
+
+    hass = CountingHass(running)
+    session._SSL_CONTEXTS.clear()
+    wall, cpu = time.perf_counter(), time.process_time()
+    for poll in range(polls):
+        await poll_cached(hass, poll)
+    cached = (hass.jobs, time.perf_counter() - wall, time.process_time() - cpu)
+
+    print(
+        f"{polls} polls over {len(CONTEXTS_PER_POLL)} areas, "
+        f"logging in every {LOGIN_EVERY} polls"
+    )
+    for name, (jobs, wall_time, cpu_time) in (
+        ("uncached", uncached),
+        ("cached", cached),
+    ):
+        print(
+            f"  {name + ':':<9} {jobs:>6} executor jobs, "
+            f"{wall_time * 1000:9.2f} ms wall, {cpu_time * 1000:9.2f} ms CPU"
+        )
+    print(
+        f"  saving per poll: {(uncached[0] - cached[0]) / polls:.2f} executor jobs, "
+        f"{(uncached[2] - cached[2]) / polls * 1000:.3f} ms CPU"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(measure(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
@@ -0,0 +1,105 @@
+"""Benchmark pricing consumptions with the tariff against the tier walk.
+
+Run from the repository root:
+
+    python benchmarks/bench_tariff.py [consumptions]
+
+Before the tariff, every consumption was priced by walking through the
+tiers and formatting the cost as a string, which the reading history
+parsed back to a number twice per day. Now the cost of the tiers below
+each threshold is computed once, a consumption is priced with a bisect
+and many at once with NumPy when it is installed. Costs are remembered
+per (tariff, kWh), so pricing the same history again is a lookup.
+
+Home Assistant is not needed, the package is registered without running
+its __init__ and only the tariff and its constants are loaded.
+"""
+
+import importlib
+import importlib.util
+import os
+import random
+import sys
+import time
+
+PACKAGE = os.path.join(
+    os.path.dirname(__file__), "..", "custom_components", "nestup_evn"
+)
+
+spec = importlib.util.spec_from_file_location(
+    "nestup_evn",
+    os.path.join(PACKAGE, "__init__.py"),
+    submodule_search_locations=[PACKAGE],
+)
+sys.modules[spec.name] = importlib.util.module_from_spec(spec)
+
+tariff = importlib.import_module("nestup_evn.tariff")
+TARIFF_CACHE_SIZE = importlib.import_module("nestup_evn.const").TARIFF_CACHE_SIZE
+
+VIETNAM_ECOST_STAGES = dict(
+    zip(tariff.TARIFFS.latest.thresholds, tariff.TARIFFS.latest.prices)
+)
+VIETNAM_ECOST_VAT = tariff.TARIFFS.latest.vat
+
+
+def calc_ecost(kwh: float) -> str:
+    """Mirror of nestup_evn.calc_ecost, before the tariff"""
+
+    total_price = 0.0
+
+    e_stage_list = list(VIETNAM_ECOST_STAGES.keys())
+
+    for index, e_stage in enumerate(e_stage_list):
+        if kwh < e_stage:
+            break
+
+        if e_stage == e_stage_list[-1]:
+            total_price += (kwh - e_stage) * VIETNAM_ECOST_STAGES[e_stage]
+        else:
+            next_stage = e_stage_list[index + 1]
+            total_price += (
+                (next_stage - e_stage) if kwh > next_stage else (kwh - e_stage)
+            ) * VIETNAM_ECOST_STAGES[e_stage]
+
+    total_price = int(round((total_price / 100) * (100 + VIETNAM_ECOST_VAT)))
+
+    return str(total_price)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def measure(count: int) -> None:
+    rng = random.Random(0)
+    values = [round(rng.uniform(0, 1000), 2) for _ in range(count)]
+    latest = tariff.TARIFFS.latest
+
+    walked, walk = timed(lambda: [int(calc_ecost(value)) for value in values])
+    bisected, bisect = timed(lambda: [latest.cost(value) for value in values])
+    # The last costs priced are still remembered
+    recent = values[-TARIFF_CACHE_SIZE:]
+    _, remembered = timed(lambda: [latest.cost(value) for value in recent])
+    batched, batch = timed(latest.costs, values)
+
+    if not walked == bisected == list(batched):
+        raise SystemExit("The tariff does not price as the tier walk does")
+
+    print(f"{count} consumptions, NumPy {'on' if tariff.np else 'off'}")
+    for name, elapsed, priced in (
+        ("tier walk", walk, count),
+        ("bisect", bisect, count),
+        ("remembered", remembered, len(recent)),
+        ("batch", batch, count),
+    ):
+        per_value = elapsed / priced
+        print(
+            f"  {name + ':':<11} {per_value * 1e6:8.3f} us per consumption "
+            f"({walk / count / per_value:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    measure(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -1,13 +1,83 @@
 from __future__ import annotations
 
+import voluptuous as vol
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.typing import ConfigType
+
+from .const import (
+    CONF_AREA,
+    CONF_BACKFILL_DAYS,
+    CONF_CUSTOMER_ID,
+    CONF_MAX_STALE_AGE,
+    CONF_REFRESH_CONCURRENCY,
+    CONF_USERNAME,
+    DEFAULT_BACKFILL_DAYS,
+    DEFAULT_MAX_STALE_AGE,
+    DEFAULT_REFRESH_CONCURRENCY,
+    DOMAIN,
+)
+from .history import async_get_reading_history
+from .refresh import async_get_refresh_queue
+from .services import async_setup_services
+from .storage import async_get_auth_store, async_get_result_store
+from .types import AREA_POLICIES
+from .websocket import async_setup_websocket
+
+CONFIG_SCHEMA = vol.Schema(
+    {
+        vol.Optional(DOMAIN): vol.Schema(
+            {
+                vol.Optional(
+                    CONF_REFRESH_CONCURRENCY, default=DEFAULT_REFRESH_CONCURRENCY
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    CONF_MAX_STALE_AGE, default=DEFAULT_MAX_STALE_AGE
+                ): cv.positive_time_period,
+                vol.Optional(
+                    CONF_BACKFILL_DAYS, default=DEFAULT_BACKFILL_DAYS
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            }
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
 
-from .const import DOMAIN
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Register the services and websocket API, apply the domain-wide settings."""
+    async_setup_services(hass)
+    async_setup_websocket(hass)
+
+    if DOMAIN in config:
+        async_get_refresh_queue(hass).concurrency = config[DOMAIN][
+            CONF_REFRESH_CONCURRENCY
+        ]
+        hass.data[DOMAIN][CONF_MAX_STALE_AGE] = config[DOMAIN][CONF_MAX_STALE_AGE]
+        hass.data[DOMAIN][CONF_BACKFILL_DAYS] = config[DOMAIN][CONF_BACKFILL_DAYS]
+
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Establish connection with EVN Cloud."""
+
+    # Older entries kept a copy of the area's policies, only ever read by name
+    if any(key in entry.data[CONF_AREA] for key in AREA_POLICIES):
+        hass.config_entries.async_update_entry(
+            entry,
+            data={
+                **entry.data,
+                CONF_AREA: {
+                    key: value
+                    for key, value in entry.data[CONF_AREA].items()
+                    if key not in AREA_POLICIES
+                },
+            },
+        )
+
     hass.data.setdefault(DOMAIN, {}).setdefault(entry.entry_id, {}).update(entry.data)
     await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
     return True
@@ -26,3 +96,22 @@ async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
     await async_unload_entry(hass, entry)
     await async_setup_entry(hass, entry)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the stored data of the entry, and the EVN session once unused."""
+    await async_get_result_store(hass).async_remove(entry.data[CONF_CUSTOMER_ID])
+    await async_get_reading_history(hass, entry.data[CONF_CUSTOMER_ID]).async_remove()
+
+    area_name = entry.data[CONF_AREA]["name"]
+    username = entry.data.get(CONF_USERNAME)
+
+    for other_entry in hass.config_entries.async_entries(DOMAIN):
+        if (
+            other_entry.entry_id != entry.entry_id
+            and other_entry.data[CONF_AREA]["name"] == area_name
+            and other_entry.data.get(CONF_USERNAME) == username
+        ):
+            return
+
+    await async_get_auth_store(hass).async_remove(area_name, username)
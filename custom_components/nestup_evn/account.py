@@ -0,0 +1,703 @@
+"""EVN accounts shared by the customer IDs they manage."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime, timedelta
+from functools import partial
+import logging
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from . import nestup_evn
+from .const import (
+    ATTR_LAST_SUCCESS,
+    ATTR_STALE,
+    AUTH_KEYS,
+    BILLING_SCAN_INTERVAL,
+    CONF_MAX_STALE_AGE,
+    CONF_ERR_INVALID_AUTH,
+    CONF_ERR_UNKNOWN,
+    CONF_SUCCESS,
+    DATA_ACCOUNTS,
+    DATA_FLOW_HANDOFF,
+    DEFAULT_MAX_STALE_AGE,
+    DOMAIN,
+    FLOW_HANDOFF_TTL,
+    ID_TO_DATE,
+    MAX_CONCURRENT_CUSTOMERS,
+    POLL_LEARN_INTERVAL,
+    PRIORITY_USER,
+    REVALIDATE_BASE_DELAY,
+    REVALIDATE_MAX_DELAY,
+    SOURCE_BILLING,
+    SOURCE_CACHE_TTL,
+    SOURCE_CONSUMPTION,
+    SOURCES,
+)
+from .refresh import REFRESH_PRIORITY, async_get_refresh_queue
+from .resilience import EVNRequestError
+from .history import DailySeries, async_get_reading_history, period_start
+from .schedule import async_get_publish_schedule, evn_now, staggered_interval
+from .session import async_get_session_pool
+from .storage import async_get_result_store
+from .types import DailyReading
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class EVNCoordinator(DataUpdateCoordinator):
+    """Coordinator whose requested refreshes go ahead of scheduled ones"""
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Construct the coordinator, without any daily series."""
+        super().__init__(*args, **kwargs)
+        # Daily readings of the billing period by customer ID, kept out of
+        # data so that they never end up in state attributes
+        self.series: dict[str, DailySeries] = {}
+        # Set by a requested refresh until it runs, the debouncer may defer
+        # it to a timer that does not share the requester's context
+        self._refresh_requested = False
+
+    async def async_request_refresh(self) -> None:
+        """Refresh as asked by the user or an entity, before scheduled work."""
+
+        self._refresh_requested = True
+        await super().async_request_refresh()
+
+    async def _async_refresh(self, *args, **kwargs) -> None:
+        """Refresh, ahead of scheduled work while a requested refresh is pending."""
+
+        if not self._refresh_requested:
+            await super()._async_refresh(*args, **kwargs)
+            return
+
+        # Any refresh now also serves the request, it cancels the debounced one
+        self._refresh_requested = False
+        token = REFRESH_PRIORITY.set(PRIORITY_USER)
+
+        try:
+            await super()._async_refresh(*args, **kwargs)
+        finally:
+            REFRESH_PRIORITY.reset(token)
+
+
+class EVNAccount:
+    """One login to an EVN area, shared by every customer ID under it"""
+
+    def __init__(
+        self, hass: HomeAssistant, area: dict[str, Any], username: str, password: str
+    ) -> None:
+        """Construct the account, logged out."""
+        self.hass = hass
+        self.username = username
+        self.password = password
+        self.area_name = area["name"]
+        # Holds the session of the account once logged in, the session saved
+        # in the config entry at setup time is superseded by the stored one
+        self.area = {key: value for key, value in area.items() if key not in AUTH_KEYS}
+        self.api = nestup_evn.EVNAPI(
+            hass, async_get_session_pool(hass).async_acquire(self.area_name)
+        )
+        self._relogin_lock = asyncio.Lock()
+        # Monthly start day of every customer ID using this account
+        self._customers: dict[str, Any] = {}
+        # Failed refreshes retried in the background, by (source, customer ID),
+        # as the number of attempts so far and the cancel of the next one
+        self._revalidations: dict[
+            tuple[str, str], tuple[int, CALLBACK_TYPE | None]
+        ] = {}
+
+        # Per source, one scheduled pass refreshes every customer ID of the
+        # account, its data maps each customer ID to its latest result
+        self.coordinators: dict[str, DataUpdateCoordinator] = {}
+
+        for source, update_interval in (
+            (SOURCE_CONSUMPTION, POLL_LEARN_INTERVAL),
+            (SOURCE_BILLING, BILLING_SCAN_INTERVAL),
+        ):
+            coordinator = self.coordinators[source] = EVNCoordinator(
+                hass,
+                _LOGGER,
+                name=f"{DOMAIN}-{self.area_name}-{username}-{source}",
+                update_method=partial(self._async_update_customers, source),
+                update_interval=update_interval,
+            )
+            coordinator.data = {}
+
+    @property
+    def session_token(self) -> str | None:
+        """Return the token identifying the current session."""
+        return self.area.get("access_token") or self.area.get("evn_session")
+
+    @property
+    def customers(self) -> dict[str, Any]:
+        """Return the customer IDs using this account."""
+        return self._customers
+
+    async def async_request_update(
+        self, customer_id: str, source: str
+    ) -> dict[str, Any]:
+        """Request new data of one source for one customer ID of the account."""
+        return await self.api.request_update(
+            self.area,
+            self.username,
+            self.password,
+            customer_id,
+            self._customers.get(customer_id),
+            (source,),
+        )
+
+    async def async_update_customer(
+        self, customer_id: str, source: str
+    ) -> dict[str, Any]:
+        """Update one source of a customer ID, logging in again if needed."""
+
+        session_token = self.session_token
+
+        data = await self.async_request_update(customer_id, source)
+        status = data.get("status")
+
+        if status == CONF_ERR_INVALID_AUTH:
+            _LOGGER.info(
+                "[EVN ID %s] Expired session, try reauthenticating.",
+                customer_id,
+            )
+
+            login_state = await self.async_relogin(customer_id, session_token)
+
+            if login_state == CONF_SUCCESS:
+                data = await self.async_request_update(customer_id, source)
+                status = data.get("status")
+
+        if status == CONF_SUCCESS:
+            _LOGGER.info(
+                "[EVN ID %s] Successfully fetched new %s data from EVN Server.",
+                customer_id,
+                source,
+            )
+
+            if source == SOURCE_CONSUMPTION:
+                await self._async_store_series(customer_id)
+
+        else:
+            _LOGGER.warning(
+                "[EVN ID %s] Could not fetch new %s data - %s",
+                customer_id,
+                source,
+                data.get("data"),
+            )
+
+        return data
+
+    async def _async_store_series(self, customer_id: str) -> None:
+        """Record the daily readings polled for the billing period of a customer ID."""
+
+        if not (series := self.api.series(customer_id)):
+            return
+
+        await async_get_reading_history(self.hass, customer_id).async_add(
+            series, self._customers.get(customer_id) or 1
+        )
+        self.coordinators[SOURCE_CONSUMPTION].series[customer_id] = DailySeries(series)
+
+    async def async_request_series(
+        self, customer_id: str, from_date: date, to_date: date
+    ) -> dict[str, Any]:
+        """Request the daily readings of a customer ID, logging in again if needed."""
+
+        for _ in range(2):
+            session_token = self.session_token
+
+            data = await self.api.request_series(
+                self.area, self.username, self.password, customer_id, from_date, to_date
+            )
+
+            if data.get("status") != CONF_ERR_INVALID_AUTH or (
+                await self.async_relogin(customer_id, session_token) != CONF_SUCCESS
+            ):
+                break
+
+        return data
+
+    async def async_restore_customer(self, customer_id: str) -> None:
+        """Show the results stored for a customer ID until it is refreshed."""
+
+        if (handoff := _async_take_handoff(self.hass, customer_id)) is not None:
+            credentials, result, kept = handoff
+
+            # The flow adding the customer ID just logged in and fetched it
+            self.area.update(credentials)
+
+            if kept is not None:
+                self.api.keep_series(customer_id, kept)
+                await self._async_store_series(customer_id)
+
+            for source in SOURCES:
+                self.coordinators[source].data[customer_id] = self._settle(
+                    source, customer_id, result
+                )
+
+        await self._async_restore_series(customer_id)
+
+        results = await async_get_result_store(self.hass).async_get(customer_id)
+        now = dt_util.utcnow()
+
+        for source, result in results.items():
+            coordinator = self.coordinators.get(source)
+
+            if (
+                coordinator is None
+                or customer_id not in self._customers
+                or customer_id in coordinator.data
+                or now - result[ATTR_LAST_SUCCESS] > self._max_stale_age
+            ):
+                continue
+
+            # Results young enough to skip the first fetch are as good as new
+            coordinator.data[customer_id] = {
+                **result,
+                ATTR_STALE: now - result[ATTR_LAST_SUCCESS] > SOURCE_CACHE_TTL[source],
+            }
+
+    async def _async_restore_series(self, customer_id: str) -> None:
+        """Rebuild the daily series of a customer ID from its reading history."""
+
+        coordinator = self.coordinators[SOURCE_CONSUMPTION]
+
+        if customer_id in coordinator.series:
+            return
+
+        history = async_get_reading_history(self.hass, customer_id)
+        await history.async_load()
+
+        if (last_day := history.last_day) is None:
+            return
+
+        start = period_start(last_day, self._customers.get(customer_id) or 1)
+
+        coordinator.series[customer_id] = DailySeries(
+            DailyReading(day, index, consumption)
+            for day, index, consumption, _ in history.records(start, last_day)
+        )
+
+    async def async_refresh_customer(self, customer_id: str) -> None:
+        """Fetch a customer ID joining the account, outside the scheduled passes.
+
+        Sources restored from results younger than their cache TTL are skipped.
+        """
+
+        refresh_queue = async_get_refresh_queue(self.hass)
+        now = dt_util.utcnow()
+
+        sources = [
+            source
+            for source in SOURCES
+            if (result := self.coordinators[source].data.get(customer_id)) is None
+            or ATTR_LAST_SUCCESS not in result
+            or now - result[ATTR_LAST_SUCCESS] > SOURCE_CACHE_TTL[source]
+        ]
+
+        async def update(source: str) -> dict[str, Any]:
+            async with refresh_queue.slot():
+                return await self.async_update_customer(customer_id, source)
+
+        results = await asyncio.gather(
+            *(update(source) for source in sources), return_exceptions=True
+        )
+
+        for source, result in zip(sources, results):
+            if isinstance(result, Exception) and not isinstance(
+                result, EVNRequestError
+            ):
+                result = _error_result(customer_id, source, result)
+
+            if (
+                isinstance(result, BaseException)
+                and not isinstance(result, EVNRequestError)
+                or customer_id not in self._customers
+            ):
+                continue
+
+            coordinator = self.coordinators[source]
+
+            # A failure flags the data restored at startup stale, or drops it
+            if (settled := self._settle(source, customer_id, result)) is None:
+                coordinator.data.pop(customer_id, None)
+            else:
+                coordinator.data[customer_id] = settled
+
+            await self._async_adapt_interval(source, coordinator.data)
+            coordinator.async_update_listeners()
+
+        for result in results:
+            # Unexpected errors were settled as error results above
+            if isinstance(result, EVNRequestError) or (
+                isinstance(result, BaseException) and not isinstance(result, Exception)
+            ):
+                raise result
+
+    async def _async_update_customers(self, source: str) -> dict[str, dict[str, Any]]:
+        """Refresh one source of every customer ID of the account, a few at a time."""
+
+        limit = asyncio.Semaphore(MAX_CONCURRENT_CUSTOMERS)
+        refresh_queue = async_get_refresh_queue(self.hass)
+        customer_ids = list(self._customers)
+
+        async def update(customer_id: str) -> dict[str, Any]:
+            async with limit, refresh_queue.slot():
+                return await self.async_update_customer(customer_id, source)
+
+        results = await asyncio.gather(
+            *(update(customer_id) for customer_id in customer_ids),
+            return_exceptions=True,
+        )
+
+        data = {}
+        errors = []
+
+        for customer_id, result in zip(customer_ids, results):
+            if not isinstance(result, Exception) and isinstance(result, BaseException):
+                raise result
+
+            # One customer ID failing does not throw away the others
+            if isinstance(result, Exception) and not isinstance(
+                result, EVNRequestError
+            ):
+                result = _error_result(customer_id, source, result)
+
+            if (settled := self._settle(source, customer_id, result)) is None:
+                errors.append(result)
+            else:
+                data[customer_id] = settled
+
+        if errors and len(errors) == len(customer_ids):
+            raise UpdateFailed(str(errors[0])) from errors[0]
+
+        await self._async_adapt_interval(source, data)
+
+        return data
+
+    def _settle(
+        self, source: str, customer_id: str, result: dict[str, Any] | EVNRequestError
+    ) -> dict[str, Any] | None:
+        """Return the data to show for a refresh of a customer ID.
+
+        A successful result is stamped with its time. After a failure the
+        last good data is served, flagged stale, until it is older than the
+        maximum age, and the refresh is retried in the background.
+        """
+
+        if not isinstance(result, Exception) and result.get("status") == CONF_SUCCESS:
+            self._async_cancel_revalidation(source, customer_id)
+
+            settled = {**result, ATTR_LAST_SUCCESS: dt_util.utcnow(), ATTR_STALE: False}
+            async_get_result_store(self.hass).async_set(customer_id, source, settled)
+
+            return settled
+
+        if isinstance(result, EVNRequestError):
+            _LOGGER.warning(
+                "[EVN ID %s] Could not reach EVN Server - %s", customer_id, result
+            )
+
+        self._async_schedule_revalidation(source, customer_id)
+
+        previous = self.coordinators[source].data.get(customer_id)
+
+        if previous is not None and previous.get("status") == CONF_SUCCESS:
+            if dt_util.utcnow() - previous[ATTR_LAST_SUCCESS] <= self._max_stale_age:
+                return {**previous, ATTR_STALE: True}
+
+            _LOGGER.warning(
+                "[EVN ID %s] No new %s data since %s, dropping the last one",
+                customer_id,
+                source,
+                previous[ATTR_LAST_SUCCESS],
+            )
+
+        return None if isinstance(result, Exception) else result
+
+    @property
+    def _max_stale_age(self) -> timedelta:
+        """Return how long the last good data may be served."""
+        return self.hass.data[DOMAIN].get(CONF_MAX_STALE_AGE, DEFAULT_MAX_STALE_AGE)
+
+    @callback
+    def _async_schedule_revalidation(self, source: str, customer_id: str) -> None:
+        """Retry a failed refresh later, waiting longer after each failure."""
+
+        attempts, cancel = self._revalidations.get((source, customer_id), (0, None))
+
+        if cancel is not None:
+            cancel()
+
+        delay = min(REVALIDATE_BASE_DELAY * 2**attempts, REVALIDATE_MAX_DELAY)
+
+        self._revalidations[(source, customer_id)] = (
+            attempts + 1,
+            async_call_later(
+                self.hass, delay, partial(self._async_revalidate, source, customer_id)
+            ),
+        )
+
+    @callback
+    def _async_cancel_revalidation(self, source: str, customer_id: str) -> None:
+        """Forget the retries of a refresh."""
+
+        _, cancel = self._revalidations.pop((source, customer_id), (0, None))
+
+        if cancel is not None:
+            cancel()
+
+    async def _async_revalidate(self, source: str, customer_id: str, _now=None) -> None:
+        """Retry a failed refresh of a customer ID in the background."""
+
+        attempts, _ = self._revalidations.get((source, customer_id), (0, None))
+        self._revalidations[(source, customer_id)] = (attempts, None)
+
+        if customer_id not in self._customers:
+            return
+
+        _LOGGER.debug(
+            "[EVN ID %s] Retrying %s data, attempt %s", customer_id, source, attempts
+        )
+
+        try:
+            async with async_get_refresh_queue(self.hass).slot():
+                result = await self.async_update_customer(customer_id, source)
+        except EVNRequestError as ex:
+            result = ex
+        except Exception as ex:
+            result = _error_result(customer_id, source, ex)
+
+        settled = self._settle(source, customer_id, result)
+
+        if settled is not None and customer_id in self._customers:
+            coordinator = self.coordinators[source]
+            coordinator.data[customer_id] = settled
+            coordinator.async_update_listeners()
+
+    @callback
+    def async_remove_customer(self, customer_id: str) -> None:
+        """Stop updating a customer ID."""
+
+        self._customers.pop(customer_id, None)
+
+        for source, coordinator in self.coordinators.items():
+            coordinator.data.pop(customer_id, None)
+            coordinator.series.pop(customer_id, None)
+            self._async_cancel_revalidation(source, customer_id)
+
+    async def _async_adapt_interval(
+        self, source: str, data: dict[str, dict[str, Any]]
+    ) -> None:
+        """Time the next pass of a source, following the publish window."""
+
+        coordinator = self.coordinators[source]
+        key = f"{self.area_name}:{self.username}:{source}"
+
+        if source != SOURCE_CONSUMPTION:
+            coordinator.update_interval = staggered_interval(
+                key, BILLING_SCAN_INTERVAL, evn_now()
+            )
+            return
+
+        # The area's readings are in once every customer ID has them
+        latest = min(
+            (
+                reading
+                for result in data.values()
+                if (reading := _latest_reading(result)) is not None
+            ),
+            default=None,
+        )
+
+        schedule = async_get_publish_schedule(self.hass)
+        now = evn_now()
+
+        if latest is not None:
+            await schedule.async_observe(self.area_name, latest, now)
+
+        coordinator.update_interval = staggered_interval(
+            key, schedule.next_interval(self.area_name, latest, now), now
+        )
+
+        _LOGGER.debug(
+            "Next update of %s in %s", coordinator.name, coordinator.update_interval
+        )
+
+    async def async_relogin(self, customer_id: str, rejected_token: str | None) -> str:
+        """Login again after the session was rejected.
+
+        Customers hitting the rejection together wait on the same lock,
+        only the first one logs in and the others reuse its new session.
+        """
+
+        async with self._relogin_lock:
+            if self.session_token is not None and self.session_token != rejected_token:
+                return CONF_SUCCESS
+
+            return await self.api.login(
+                self.area, self.username, self.password, customer_id
+            )
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop the account's background work and release its session."""
+
+        for source, customer_id in list(self._revalidations):
+            self._async_cancel_revalidation(source, customer_id)
+
+        self.api.async_shutdown()
+        async_get_session_pool(self.hass).async_release(self.area_name)
+
+
+@callback
+def async_hand_over(
+    hass: HomeAssistant,
+    customer_id: str,
+    credentials: dict[str, Any],
+    result: dict[str, Any],
+    kept: dict[str, Any] | None = None,
+) -> None:
+    """Keep the session, result and readings of a config flow for its entry."""
+
+    handoffs = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_FLOW_HANDOFF, {})
+    handoffs[customer_id] = (dt_util.utcnow(), credentials, result, kept)
+
+
+@callback
+def _async_take_handoff(
+    hass: HomeAssistant, customer_id: str
+) -> tuple[dict[str, Any], dict[str, Any], dict[str, Any] | None] | None:
+    """Return the session, result and readings handed over for a customer ID, once."""
+
+    handoffs = hass.data.get(DOMAIN, {}).get(DATA_FLOW_HANDOFF, {})
+    now = dt_util.utcnow()
+
+    # Flows whose entry never got set up leave their handoff behind
+    for expired in [
+        key
+        for key, (created, *_) in handoffs.items()
+        if now - created > FLOW_HANDOFF_TTL
+    ]:
+        del handoffs[expired]
+
+    if (handoff := handoffs.pop(customer_id, None)) is None:
+        return None
+
+    _, credentials, result, kept = handoff
+
+    if result.get("status") != CONF_SUCCESS:
+        return None
+
+    return credentials, result, kept
+
+
+def _error_result(customer_id: str, source: str, ex: Exception) -> dict[str, Any]:
+    """Turn an unexpected failure to refresh a customer ID into an error result."""
+
+    _LOGGER.error(
+        "[EVN ID %s] Unexpected error fetching %s data",
+        customer_id,
+        source,
+        exc_info=ex,
+    )
+
+    return {"status": CONF_ERR_UNKNOWN, "data": str(ex)}
+
+
+def _latest_reading(result: dict[str, Any]) -> date | None:
+    """Return the date of the latest reading in a formatted result."""
+
+    if result.get("status") != CONF_SUCCESS:
+        return None
+
+    try:
+        return datetime.strptime(result[ID_TO_DATE]["value"], "%d/%m/%Y").date()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class EVNAccountRegistry:
+    """Accounts in use, keyed by EVN area and username"""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Construct the registry."""
+        self.hass = hass
+        self._accounts: dict[tuple[str, str], EVNAccount] = {}
+
+    @callback
+    def async_acquire(
+        self,
+        area: dict[str, Any],
+        username: str,
+        password: str,
+        customer_id: str,
+        monthly_start=None,
+    ) -> EVNAccount:
+        """Return the account of a customer ID, creating it for the first one."""
+
+        key = (area["name"], username)
+
+        if (account := self._accounts.get(key)) is None:
+            account = self._accounts[key] = EVNAccount(
+                self.hass, area, username, password
+            )
+
+        elif account.password != password:
+            # The latest entry set up carries the latest password
+            account.password = password
+
+        account.customers[customer_id] = monthly_start
+
+        return account
+
+    @callback
+    def async_release(self, account: EVNAccount, customer_id: str) -> None:
+        """Stop using an account for a customer ID, shutting it down after the last one."""
+
+        account.async_remove_customer(customer_id)
+
+        if account.customers:
+            return
+
+        key = (account.area_name, account.username)
+
+        if self._accounts.get(key) is account:
+            del self._accounts[key]
+
+        account.async_shutdown()
+
+    def get(self, area_name: str, username: str) -> EVNAccount | None:
+        """Return the account in use for an area and username."""
+        return self._accounts.get((area_name, username))
+
+    def get_customer(self, customer_id: str) -> EVNAccount | None:
+        """Return the account in use for a customer ID."""
+        return self.customers().get(customer_id)
+
+    def customers(self) -> dict[str, EVNAccount]:
+        """Return the account of every customer ID in use."""
+        return {
+            customer_id: account
+            for account in self._accounts.values()
+            for customer_id in account.customers
+        }
+
+
+@callback
+def async_get_account_registry(hass: HomeAssistant) -> EVNAccountRegistry:
+    """Return the account registry shared by every config entry."""
+
+    domain_data = hass.data.setdefault(DOMAIN, {})
+
+    if (registry := domain_data.get(DATA_ACCOUNTS)) is None:
+        registry = domain_data[DATA_ACCOUNTS] = EVNAccountRegistry(hass)
+
+    return registry
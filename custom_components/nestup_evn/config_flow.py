@@ -9,12 +9,16 @@ import os
 import voluptuous as vol
 
 from homeassistant import config_entries
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 
 from . import nestup_evn
+from .account import async_hand_over
 from .const import (
+    AUTH_KEYS,
     CONF_AREA,
     CONF_CUSTOMER_ID,
+    CONF_ERR_CANNOT_CONNECT,
     CONF_ERR_UNKNOWN,
     CONF_MONTHLY_START,
     CONF_PASSWORD,
@@ -22,6 +26,8 @@ from .const import (
     CONF_USERNAME,
     DOMAIN,
 )
+from .resilience import EVNRequestError
+from .session import async_get_session_pool
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -61,6 +67,16 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._api = None
         self._errors = {}
         self._branches_data = None
+        self._verified_data = None
+
+    @callback
+    def async_remove(self) -> None:
+        """Release the API and its shared session when the flow is finished or aborted."""
+        if self._api is not None:
+            self._api.async_shutdown()
+            async_get_session_pool(self.hass).async_release(
+                self._user_data[CONF_AREA]["name"]
+            )
 
     async def _load_branches_data(self):
         """Load branches data asynchronously."""
@@ -84,7 +100,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
 
             self._user_data.update(user_input)
-            self._api = nestup_evn.EVNAPI(self.hass, True)
+
+            if self._api is None:
+                self._api = nestup_evn.EVNAPI(
+                    self.hass,
+                    async_get_session_pool(self.hass).async_acquire(
+                        self._user_data[CONF_AREA]["name"]
+                    ),
+                )
 
             verify_account = await self._try_auth()
 
@@ -100,6 +123,16 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
                     self._abort_if_unique_id_configured()
 
+                    # Save the new entry logging in and fetching all over again
+                    evn_area = self._user_data[CONF_AREA]
+                    async_hand_over(
+                        self.hass,
+                        self._user_data[CONF_CUSTOMER_ID],
+                        {key: evn_area[key] for key in AUTH_KEYS if key in evn_area},
+                        self._verified_data,
+                        self._api.kept_series(self._user_data[CONF_CUSTOMER_ID]),
+                    )
+
                     return self.async_create_entry(
                         title=self._user_data[CONF_CUSTOMER_ID], data=self._user_data
                     )
@@ -186,6 +219,9 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 self._user_data.get(CONF_PASSWORD),
                 self._user_data.get(CONF_CUSTOMER_ID),
             )
+        except EVNRequestError as e:
+            _LOGGER.error(f"Unable to reach EVN Server: {e}")
+            return CONF_ERR_CANNOT_CONNECT
         except Exception as e:
             _LOGGER.exception(f"Unexpected exception: {e}")
             return CONF_ERR_UNKNOWN
@@ -206,6 +242,9 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 self._user_data.get(CONF_CUSTOMER_ID),
                 self._user_data.get(CONF_MONTHLY_START),
             )
+        except EVNRequestError as e:
+            _LOGGER.error(f"Unable to reach EVN Server: {e}")
+            return CONF_ERR_CANNOT_CONNECT
         except Exception as e:
             _LOGGER.exception(f"Unexpected exception: {e}")
             return CONF_ERR_UNKNOWN
@@ -213,4 +252,6 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             if res["status"] != CONF_SUCCESS:
                 return res["status"]
 
+            self._verified_data = res
+
         return CONF_SUCCESS
@@ -1,9 +1,56 @@
 """Constants for the EVN Data integration."""
 
-from datetime import timedelta
+from datetime import date, timedelta
 
 DEFAULT_SCAN_INTERVAL = timedelta(hours=3)
 
+# Polling adapts to when each area publishes its daily readings
+EVN_TIME_ZONE = "Asia/Ho_Chi_Minh"
+PUBLISH_SAMPLES = 10  # publish times remembered per area
+PUBLISH_MARGIN = timedelta(minutes=30)
+POLL_DENSE_INTERVAL = timedelta(minutes=15)
+POLL_LATE_INTERVAL = timedelta(hours=1)
+POLL_IDLE_INTERVAL = timedelta(hours=6)
+# Until an area's publish window is known, no denser than before adapting
+POLL_LEARN_INTERVAL = DEFAULT_SCAN_INTERVAL
+
+# Consumption follows the publish window, billing and outages change rarely
+SOURCE_CONSUMPTION = "consumption"
+SOURCE_BILLING = "billing"
+SOURCES = (SOURCE_CONSUMPTION, SOURCE_BILLING)
+BILLING_SCAN_INTERVAL = timedelta(hours=12)
+# Results younger than this are reused instead of asking EVN again
+SOURCE_CACHE_TTL = {
+    SOURCE_CONSUMPTION: timedelta(minutes=5),
+    SOURCE_BILLING: timedelta(hours=1),
+}
+CPC_HOME_TTL = timedelta(minutes=10)
+# Once a billing period was fetched, polls only ask for the days since the
+# latest reading, going back enough for the previous days
+CONSUMPTION_OVERLAP = timedelta(days=3)
+
+# Last good data is served while refreshes fail, up to a maximum age
+CONF_MAX_STALE_AGE = "max_stale_age"
+DEFAULT_MAX_STALE_AGE = timedelta(days=1)
+REVALIDATE_BASE_DELAY = timedelta(minutes=5)
+REVALIDATE_MAX_DELAY = timedelta(hours=1)
+ATTR_STALE = "stale"
+ATTR_LAST_SUCCESS = "last_success"
+
+# Past readings are imported into long-term statistics, one billing
+# period per request, resuming from the last day imported
+CONF_BACKFILL_DAYS = "backfill_days"
+DEFAULT_BACKFILL_DAYS = 0  # disabled
+BACKFILL_INTERVAL = timedelta(days=1)
+STATISTIC_ENERGY = "energy"
+STATISTIC_COST = "cost"
+UNIT_VND = "VND"
+
+# Entries are spread out so they do not hit EVN all at once
+POLL_STAGGER_STEP = timedelta(minutes=30)
+POLL_JITTER = timedelta(minutes=2)
+STARTUP_SPREAD = timedelta(minutes=2)
+
 DOMAIN = "nestup_evn"
 
 CONF_DEVICE_NAME = "EVN Monitor"
@@ -11,6 +58,68 @@ CONF_DEVICE_MODEL = "Vietnam EVN Monitor"
 CONF_DEVICE_MANUFACTURER = "Huy V. Trinh"
 CONF_DEVICE_SW_VERSION = "2.4.2"
 
+DATA_SESSION_POOL = "session_pool"
+
+SESSION_LIMIT_PER_HOST = 4
+SESSION_KEEPALIVE_TIMEOUT = 60  # in seconds
+SESSION_LINGER_TIME = 30  # in seconds
+
+MAX_CONCURRENT_REQUESTS = 3  # per account
+MAX_CONCURRENT_CUSTOMERS = 2  # per account
+
+# Refreshes of every entry share one queue, user requests go first
+DATA_REFRESH_QUEUE = "refresh_queue"
+CONF_REFRESH_CONCURRENCY = "refresh_concurrency"
+DEFAULT_REFRESH_CONCURRENCY = 4
+PRIORITY_USER = 0
+PRIORITY_SCHEDULED = 1
+PRIORITY_BACKFILL = 2
+REFRESH_SLOW_WAIT = 30  # in seconds
+
+DATA_CIRCUIT_BREAKERS = "circuit_breakers"
+DATA_RATE_LIMITERS = "rate_limiters"
+REQUEST_WAIT_PUBLISH_INTERVAL = 30  # in seconds
+# Diagnostic sensors of an EVN area, added by one of its entries
+DATA_AREA_ENTITIES = "area_entities"
+DATA_SINGLE_FLIGHT = "single_flight"
+DATA_ACCOUNTS = "accounts"
+# Session and first result of a config flow, picked up by the entry it creates
+DATA_FLOW_HANDOFF = "flow_handoff"
+FLOW_HANDOFF_TTL = timedelta(minutes=5)
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+# Session data stored in the area dict after logging in
+AUTH_KEYS = ("access_token", "token_expiry", "evn_session", "expires")
+
+STORAGE_VERSION = 1
+STORAGE_KEY_AUTH = f"{DOMAIN}.auth"
+DATA_AUTH_STORE = "auth_store"
+AUTH_SAVE_DELAY = 10  # in seconds
+STORAGE_KEY_SCHEDULE = f"{DOMAIN}.schedule"
+STORAGE_KEY_RESULTS = f"{DOMAIN}.results"
+DATA_RESULT_STORE = "result_store"
+RESULTS_SAVE_DELAY = 30  # in seconds
+DATA_PUBLISH_SCHEDULE = "publish_schedule"
+STORAGE_KEY_HISTORY = f"{DOMAIN}.history"
+DATA_READING_HISTORY = "reading_history"
+
+# History exports read a few billing periods ahead of the file being written
+SERVICE_EXPORT_HISTORY = "export_history"
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_PARQUET = "parquet"
+EXPORT_COLUMNS = ("customer_id", "day", "index", "consumption", "cost")
+EXPORT_CONCURRENCY = 3
+EXPORT_DEFAULT_PERIOD = timedelta(days=365)
+
+# Daily series are sent to the frontend a page of days at a time
+SERIES_PAGE_SIZE = 31
+SERIES_PAGE_SIZE_MAX = 366
+
+TOKEN_REFRESH_MARGIN = timedelta(minutes=10)
+TOKEN_REFRESH_MIN_DELAY = timedelta(minutes=1)
+
 CONF_USERNAME = "username"
 CONF_PASSWORD = "password"
 CONF_CUSTOMER_ID = "customer_id"
@@ -41,18 +150,28 @@ ID_LOADSHEDDING = "loadshedding"
 ID_FROM_DATE = "from_date"
 ID_TO_DATE = "to_date"
 ID_LATEST_UPDATE = "latest_update"
+ID_CIRCUIT_BREAKER = "circuit_breaker"
+ID_REQUEST_WAIT = "request_wait"
 
 STATUS_N_PAYMENT_NEEDED = "Đã thanh toán"
 STATUS_PAYMENT_NEEDED = "Chưa thanh toán"
 STATUS_LOADSHEDDING = "Không có lịch cắt điện"
 
-VIETNAM_ECOST_VAT = 8  # in %
-VIETNAM_ECOST_STAGES = {
+# Retail tariffs and VAT rates by the day they take effect, a billing period
+# spanning a change is priced pro rata by day
+VIETNAM_ECOST_TARIFFS = {
     # kWh : VND
-    0: 1984,
-    50: 2050,
-    100: 2380,
-    200: 2998,
-    300: 3350,
-    400: 3460,
+    date(2019, 3, 20): {0: 1678, 50: 1734, 100: 2014, 200: 2536, 300: 2834, 400: 2927},
+    date(2023, 5, 4): {0: 1728, 50: 1786, 100: 2074, 200: 2612, 300: 2919, 400: 3015},
+    date(2023, 11, 9): {0: 1806, 50: 1866, 100: 2167, 200: 2729, 300: 3050, 400: 3151},
+    date(2024, 10, 11): {0: 1893, 50: 1956, 100: 2271, 200: 2860, 300: 3197, 400: 3302},
+    date(2025, 5, 10): {0: 1984, 50: 2050, 100: 2380, 200: 2998, 300: 3350, 400: 3460},
+}
+VIETNAM_ECOST_VAT_RATES = {
+    # in %
+    date(2019, 3, 20): 10,
+    date(2022, 2, 1): 8,
+    date(2023, 1, 1): 10,
+    date(2023, 7, 1): 8,
 }
+TARIFF_CACHE_SIZE = 4096  # (tariff, kWh) costs remembered
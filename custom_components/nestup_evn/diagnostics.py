@@ -0,0 +1,34 @@
+"""Diagnostics support for the EVN integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import AUTH_KEYS, CONF_AREA, CONF_PASSWORD, CONF_USERNAME
+from .refresh import async_get_refresh_queue
+from .resilience import async_get_circuit_breaker, async_get_rate_limiter
+
+TO_REDACT = {CONF_USERNAME, CONF_PASSWORD, *AUTH_KEYS}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+
+    area_name = entry.data[CONF_AREA]["name"]
+    circuit_breaker = async_get_circuit_breaker(hass, area_name)
+
+    return {
+        "entry": async_redact_data(entry.data, TO_REDACT),
+        "refresh_queue": async_get_refresh_queue(hass).attributes,
+        "circuit_breaker": {
+            "state": circuit_breaker.state,
+            **circuit_breaker.attributes,
+        },
+        "rate_limiter": async_get_rate_limiter(hass, area_name).attributes,
+    }
@@ -0,0 +1,385 @@
+"""Daily readings of every customer ID, kept on disk as fixed-width records."""
+
+from __future__ import annotations
+
+import asyncio
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
+from datetime import date, timedelta
+from itertools import accumulate
+import logging
+import mmap
+import os
+import struct
+from typing import TYPE_CHECKING
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import STORAGE_DIR
+
+from .const import (
+    CONF_EMPTY,
+    CONF_SUCCESS,
+    DATA_READING_HISTORY,
+    DOMAIN,
+    PRIORITY_BACKFILL,
+    STORAGE_KEY_HISTORY,
+)
+from .refresh import async_get_refresh_queue
+from .tariff import TARIFFS
+from .types import DailyReading
+
+if TYPE_CHECKING:
+    from .account import EVNAccount
+
+_LOGGER = logging.getLogger(__name__)
+
+# Day as a proleptic ordinal, meter index, consumption in kWh and cost in VND
+RECORD = struct.Struct("<Iddd")
+
+
+def period_start(day: date, monthly_start: int) -> date:
+    """Return the first day of the billing period a day belongs to."""
+
+    if day.day >= monthly_start:
+        return day.replace(day=monthly_start)
+
+    last_month = day.replace(day=1) - timedelta(days=1)
+    return last_month.replace(day=monthly_start)
+
+
+def period_end(day: date, monthly_start: int) -> date:
+    """Return the last day of the billing period a day belongs to."""
+
+    start = period_start(day, monthly_start)
+    next_start = (start.replace(day=1) + timedelta(days=32)).replace(day=monthly_start)
+
+    return next_start - timedelta(days=1)
+
+
+def billing_periods(
+    start: date, end: date, monthly_start: int
+) -> Iterator[tuple[date, date]]:
+    """Split a date range along billing periods, as their first and last day."""
+
+    while start <= end:
+        last_day = period_end(start, monthly_start)
+
+        yield start, min(last_day, end)
+
+        start = last_day + timedelta(days=1)
+
+
+async def async_fill_history(
+    hass: HomeAssistant,
+    account: EVNAccount,
+    customer_id: str,
+    start: date,
+    end: date,
+) -> bool:
+    """Fetch the readings of a billing period unless all are in the history.
+
+    Return whether the readings are in, or EVN has none for the period.
+    """
+
+    history = async_get_reading_history(hass, customer_id)
+    await history.async_load()
+
+    window = history.window(start, end)
+
+    if window.stop - window.start == (end - start).days + 1:
+        return True
+
+    async with async_get_refresh_queue(hass).slot(PRIORITY_BACKFILL):
+        try:
+            data = await account.async_request_series(customer_id, start, end)
+        except ValueError:
+            # EVNSPC raises on a range without any reading
+            return True
+
+    if data["status"] == CONF_EMPTY:
+        return True
+
+    if data["status"] != CONF_SUCCESS:
+        _LOGGER.warning(
+            "[EVN ID %s] Could not fetch readings from %s to %s - %s",
+            customer_id,
+            start,
+            end,
+            data.get("data"),
+        )
+        return False
+
+    await history.async_add(data["series"], account.customers.get(customer_id) or 1)
+
+    return True
+
+
+class DailySeries:
+    """Daily readings of one billing period, one array per field"""
+
+    def __init__(self, readings: Iterable[DailyReading] = ()) -> None:
+        """Construct the series from readings, oldest first."""
+        self.days = array("I")
+        self.indexes = array("d")
+        self.consumptions = array("d")
+
+        for reading in readings:
+            self.days.append(reading.day.toordinal())
+            self.indexes.append(reading.index or 0.0)
+            self.consumptions.append(reading.consumption)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def window(self, from_date: date, to_date: date) -> slice:
+        """Return the positions of the readings between two days, both included."""
+        return slice(
+            bisect_left(self.days, from_date.toordinal()),
+            bisect_right(self.days, to_date.toordinal()),
+        )
+
+
+class ReadingHistory:
+    """Daily readings of one customer ID, oldest first
+
+    The records are held in memory as one array per field, so a day is found
+    by bisecting the days, and mirrored to a file only ever appended to
+    unless a past reading changes.
+    """
+
+    def __init__(self, hass: HomeAssistant, customer_id: str) -> None:
+        """Construct the history, loaded on first use."""
+        self.hass = hass
+        self.path = hass.config.path(
+            STORAGE_DIR, f"{STORAGE_KEY_HISTORY}.{customer_id.lower()}"
+        )
+        self.days = array("I")
+        self.indexes = array("d")
+        self.consumptions = array("d")
+        self.costs = array("d")
+        self._write_lock = asyncio.Lock()
+        self._load_task: asyncio.Future | None = None
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @property
+    def first_day(self) -> date | None:
+        """Return the day of the oldest reading."""
+        return date.fromordinal(self.days[0]) if self.days else None
+
+    @property
+    def last_day(self) -> date | None:
+        """Return the day of the latest reading."""
+        return date.fromordinal(self.days[-1]) if self.days else None
+
+    def window(self, from_date: date, to_date: date) -> slice:
+        """Return the positions of the readings between two days, both included."""
+        return slice(
+            bisect_left(self.days, from_date.toordinal()),
+            bisect_right(self.days, to_date.toordinal()),
+        )
+
+    def get(self, day: date) -> tuple[date, float, float, float] | None:
+        """Return the record of a day as (day, index, consumption, cost)."""
+
+        position = bisect_left(self.days, day.toordinal())
+
+        if position == len(self.days) or self.days[position] != day.toordinal():
+            return None
+
+        return self._record(position)
+
+    def records(
+        self, from_date: date, to_date: date
+    ) -> Iterator[tuple[date, float, float, float]]:
+        """Yield the records between two days, both included."""
+
+        window = self.window(from_date, to_date)
+
+        for position in range(window.start, window.stop):
+            yield self._record(position)
+
+    def consumption(self, from_date: date, to_date: date) -> float:
+        """Return the consumption between two days, both included."""
+        return sum(self.consumptions[self.window(from_date, to_date)])
+
+    def cost(self, from_date: date, to_date: date) -> float:
+        """Return the cost between two days, both included."""
+        return sum(self.costs[self.window(from_date, to_date)])
+
+    async def async_load(self) -> None:
+        """Load the records once, concurrent callers share the load."""
+
+        if self._load_task is None:
+            self._load_task = self.hass.async_add_executor_job(self._load)
+
+        await self._load_task
+
+    async def async_add(
+        self, readings: Iterable[DailyReading], monthly_start: int
+    ) -> None:
+        """Record readings, each priced on the consumption of its billing period.
+
+        The cost of a reading is what it adds to the cost of its period, with
+        the tariffs in effect over the whole period pro rata by day. Every
+        period a reading falls in is priced again at once, as a reading
+        changes the cost of the days after it.
+
+        Readings past the latest one are appended, changed ones are updated
+        in place and older ones missing from the file have it rewritten.
+        """
+
+        await self.async_load()
+
+        async with self._write_lock:
+            appended = len(self.days)
+            updated: set[int] = set()
+            rewrite = False
+            periods: set[date] = set()
+
+            for reading in sorted(readings, key=lambda reading: reading.day):
+                day = reading.day.toordinal()
+                position = bisect_left(self.days, day)
+                index, consumption = reading.index or 0.0, reading.consumption
+                periods.add(period_start(reading.day, monthly_start))
+
+                if position < len(self.days) and self.days[position] == day:
+                    if self._record(position)[1:3] != (index, consumption):
+                        self.indexes[position] = index
+                        self.consumptions[position] = consumption
+                        updated.add(position)
+
+                    continue
+
+                # Priced along with the rest of its period below
+                self.days.insert(position, day)
+                self.indexes.insert(position, index)
+                self.consumptions.insert(position, consumption)
+                self.costs.insert(position, 0.0)
+
+                if position < appended:
+                    rewrite = True
+                    appended += 1
+
+            for start in periods:
+                updated.update(self._price(start, period_end(start, monthly_start)))
+
+            # Records past the file are written along with the appended ones
+            changed = sorted(position for position in updated if position < appended)
+
+            if rewrite:
+                await self.hass.async_add_executor_job(self._rewrite)
+            elif changed or appended < len(self.days):
+                await self.hass.async_add_executor_job(
+                    self._write, changed, appended
+                )
+
+    async def async_remove(self) -> None:
+        """Forget every record, removing the file."""
+
+        async with self._write_lock:
+            for column in (self.days, self.indexes, self.consumptions, self.costs):
+                del column[:]
+
+            await self.hass.async_add_executor_job(self._remove)
+
+    def _record(self, position: int) -> tuple[date, float, float, float]:
+        return (
+            date.fromordinal(self.days[position]),
+            self.indexes[position],
+            self.consumptions[position],
+            self.costs[position],
+        )
+
+    def _price(self, start: date, end: date) -> Iterator[int]:
+        """Price the readings of a billing period, yield the positions changed."""
+
+        window = self.window(start, end)
+        # Cost of the period up to each day, a day costs the difference
+        totals = TARIFFS.costs(accumulate(self.consumptions[window]), start, end)
+
+        for position, total, previous in zip(
+            range(window.start, window.stop), totals, [0, *totals]
+        ):
+            if self.costs[position] != (cost := float(total - previous)):
+                self.costs[position] = cost
+                yield position
+
+    def _pack(self, position: int) -> bytes:
+        return RECORD.pack(
+            self.days[position],
+            self.indexes[position],
+            self.consumptions[position],
+            self.costs[position],
+        )
+
+    def _load(self) -> None:
+        """Read the records from the file, run in the executor."""
+
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return
+
+        # A record cut short by a crash is left out
+        size -= size % RECORD.size
+
+        if not size:
+            return
+
+        with open(self.path, "rb") as file, mmap.mmap(
+            file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapped:
+            for day, index, consumption, cost in RECORD.iter_unpack(mapped[:size]):
+                self.days.append(day)
+                self.indexes.append(index)
+                self.consumptions.append(consumption)
+                self.costs.append(cost)
+
+    def _write(self, updated: list[int], appended: int) -> None:
+        """Update changed records and append new ones, run in the executor."""
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        mode = "r+b" if os.path.exists(self.path) else "wb"
+
+        with open(self.path, mode) as file:
+            for position in updated:
+                file.seek(position * RECORD.size)
+                file.write(self._pack(position))
+
+            file.seek(appended * RECORD.size)
+            file.truncate()
+            file.write(
+                b"".join(self._pack(position) for position in range(appended, len(self)))
+            )
+
+    def _rewrite(self) -> None:
+        """Write every record to a new file replacing the old one, run in the executor."""
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+
+        with open(temp_path, "wb") as file:
+            file.write(b"".join(self._pack(position) for position in range(len(self))))
+
+        os.replace(temp_path, self.path)
+
+    def _remove(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+@callback
+def async_get_reading_history(hass: HomeAssistant, customer_id: str) -> ReadingHistory:
+    """Return the reading history of a customer ID, shared by its users."""
+
+    histories = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_READING_HISTORY, {})
+
+    if (history := histories.get(customer_id)) is None:
+        history = histories[customer_id] = ReadingHistory(hass, customer_id)
+
+    return history
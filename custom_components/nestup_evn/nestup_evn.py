@@ -1,24 +1,26 @@
 """Setup and manage the EVN API."""
 
+import asyncio
 import base64
-from dataclasses import asdict
-from datetime import datetime, timedelta, timezone
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta, timezone
+from functools import partial
 import json
 import logging
 import os
-import ssl
 import time
 from typing import Any
 
+from aiohttp import ClientSession
 from dateutil import parser
 
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import (
-    async_create_clientsession,
-    async_get_clientsession,
-)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
 
 from .const import (
+    AUTH_KEYS,
     CONF_EMPTY,
     CONF_ERR_CANNOT_CONNECT,
     CONF_ERR_INVALID_AUTH,
@@ -27,6 +29,8 @@ from .const import (
     CONF_ERR_NOT_SUPPORTED,
     CONF_ERR_UNKNOWN,
     CONF_SUCCESS,
+    CONSUMPTION_OVERLAP,
+    CPC_HOME_TTL,
     ID_ECON_DAILY_NEW,
     ID_ECON_DAILY_OLD,
     ID_ECON_MONTHLY_NEW,
@@ -41,21 +45,37 @@ from .const import (
     ID_PAYMENT_NEEDED,
     ID_LOADSHEDDING,    
     ID_TO_DATE,
+    MAX_CONCURRENT_REQUESTS,
+    SOURCE_BILLING,
+    SOURCE_CACHE_TTL,
+    SOURCE_CONSUMPTION,
+    SOURCES,
     STATUS_N_PAYMENT_NEEDED,
     STATUS_PAYMENT_NEEDED,
     STATUS_LOADSHEDDING,    
-    VIETNAM_ECOST_STAGES,
-    VIETNAM_ECOST_VAT,
+    TOKEN_REFRESH_MARGIN,
+    TOKEN_REFRESH_MIN_DELAY,
+)
+from .resilience import (
+    EVNRequestError,
+    RetryBudget,
+    async_get_circuit_breaker,
+    async_get_rate_limiter,
+    async_get_single_flight,
+    async_request_with_retry,
 )
-from .types import EVN_NAME, VIETNAM_EVN_AREA, Area
+from .session import async_get_ssl_context
+from .storage import async_get_auth_store, credentials_valid
+from .tariff import TARIFFS
+from .types import EVN_NAME, VIETNAM_EVN_AREA, Area, DailyReading, get_evn_area
 
 _LOGGER = logging.getLogger(__name__)
 
-def create_ssl_context():
-    """Create SSL context with cipher settings"""
-    context = ssl.create_default_context()
-    context.set_ciphers("ALL:@SECLEVEL=1")
-    return context
+# Retries left for the login or update running in the current task,
+# EVNAPI is shared by every customer of an account
+_RETRY_BUDGET: ContextVar[RetryBudget] = ContextVar("evn_retry_budget")
+
+PAYMENT_UNKNOWN = {ID_PAYMENT_NEEDED: CONF_ERR_UNKNOWN, ID_M_PAYMENT_NEEDED: 0}
 
 def read_evn_branches_file(file_path):
     """Read EVN branches file synchronously"""
@@ -63,78 +83,356 @@ def read_evn_branches_file(file_path):
         return json.load(f)
 
 class EVNAPI:
-    def __init__(self, hass: HomeAssistant, is_new_session=False):
+    def __init__(self, hass: HomeAssistant, session: ClientSession | None = None):
         """Construct EVNAPI wrapper."""
         self.hass = hass  # Store hass instance
-        self._session = (
-            async_create_clientsession(hass)
-            if is_new_session
-            else async_get_clientsession(hass)
-        )
+        self._session = session or async_get_clientsession(hass)
+        self._request_limit = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
         self._evn_area = {}
+        self._session_restored = False
+        self._credentials = None
+        self._cancel_token_refresh = None
+        # Recent results by request, as (expiry, task) so that concurrent
+        # callers share the request in flight
+        self._cache: dict[tuple, tuple[float, asyncio.Future]] = {}
+        # Daily readings of the current billing period by customer ID, along
+        # with the period start and meter index they were fetched from
+        self._series: dict[str, dict[str, Any]] = {}
 
     async def login(self, evn_area, username, password, customer_id) -> str:
         """Try login into EVN corresponding with different EVN areas"""
 
         self._evn_area = evn_area
+        self._start_retry_budget()
 
         if (username is None) or (password is None):
             return CONF_ERR_UNKNOWN
 
-        if evn_area.get("name") == EVN_NAME.HCMC:
+        return await self._login_once(username, password, customer_id)
+
+    async def _login_once(self, username, password, customer_id) -> str:
+        """Login into EVN, joining any login of the same account already in flight"""
+
+        status, credentials = await async_get_single_flight(self.hass).run(
+            (self._evn_area.get("name"), username, "login"),
+            partial(self._login_shared, username, password, customer_id),
+        )
+
+        # Another instance may have logged in for us, take over its session
+        if status == CONF_SUCCESS:
+            self._evn_area.update(credentials)
+            self._credentials = (username, password, customer_id)
+            self._async_schedule_token_refresh()
+
+        return status
+
+    @callback
+    def _async_schedule_token_refresh(self) -> None:
+        """Renew the session shortly before it expires, away from data requests"""
+
+        if self._cancel_token_refresh is not None:
+            self._cancel_token_refresh()
+            self._cancel_token_refresh = None
+
+        expiry = self._evn_area.get("token_expiry")
+
+        if expiry is None or self._credentials is None:
+            return
+
+        delay = max(
+            expiry - time.time() - TOKEN_REFRESH_MARGIN.total_seconds(),
+            TOKEN_REFRESH_MIN_DELAY.total_seconds(),
+        )
+
+        self._cancel_token_refresh = async_call_later(
+            self.hass, delay, self._async_refresh_token
+        )
+
+    async def _async_refresh_token(self, _now=None) -> None:
+        """Login again with the last credentials, before the session expires"""
+
+        self._cancel_token_refresh = None
+        username, password, customer_id = self._credentials
+
+        _LOGGER.debug("Renewing EVN session of %s before it expires", username)
+
+        self._start_retry_budget()
+
+        try:
+            status = await self._login_once(username, password, customer_id)
+        except EVNRequestError as ex:
+            status = str(ex)
+
+        if status == CONF_SUCCESS:
+            return
+
+        _LOGGER.warning(f"Unable to renew EVN session of {username}: {status}")
+
+        # Keep trying while the current session is still usable
+        if time.time() < self._evn_area.get("token_expiry", 0):
+            self._cancel_token_refresh = async_call_later(
+                self.hass, TOKEN_REFRESH_MIN_DELAY, self._async_refresh_token
+            )
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop renewing the session."""
+
+        if self._cancel_token_refresh is not None:
+            self._cancel_token_refresh()
+            self._cancel_token_refresh = None
+
+    async def _login_shared(self, username, password, customer_id):
+        """Login into EVN, returning the session so that joined callers can use it"""
+
+        status = await self._login(username, password, customer_id)
+
+        credentials = {
+            key: self._evn_area[key] for key in AUTH_KEYS if key in self._evn_area
+        }
+
+        if status == CONF_SUCCESS:
+            await async_get_auth_store(self.hass).async_set(
+                self._evn_area.get("name"), username, credentials
+            )
+
+        return status, credentials
+
+    async def _async_restore_session(self, username) -> None:
+        """Reuse the session stored for this account, if still valid"""
+
+        if self._session_restored:
+            return
+
+        self._session_restored = True
+
+        credentials = await async_get_auth_store(self.hass).async_get(
+            self._evn_area.get("name"), username
+        )
+
+        if credentials_valid(credentials):
+            _LOGGER.debug("Reusing stored EVN session of %s", username)
+            self._evn_area.update(credentials)
+            self._async_schedule_token_refresh()
+
+    async def _login(self, username, password, customer_id) -> str:
+        """Login into the EVN Endpoint of the current area"""
+
+        if self._evn_area.get("name") == EVN_NAME.HCMC:
             return await self.login_evnhcmc(username, password)
 
-        elif evn_area.get("name") == EVN_NAME.HANOI:
+        elif self._evn_area.get("name") == EVN_NAME.HANOI:
             return await self.login_evnhanoi(username, password)
 
-        elif evn_area.get("name") == EVN_NAME.CPC:
+        elif self._evn_area.get("name") == EVN_NAME.CPC:
             return await self.login_evncpc(username, password)
 
-        elif evn_area.get("name") == EVN_NAME.SPC:
+        elif self._evn_area.get("name") == EVN_NAME.SPC:
             return await self.login_evnspc(username, password, customer_id)
 
-        elif evn_area.get("name") == EVN_NAME.NPC:
+        elif self._evn_area.get("name") == EVN_NAME.NPC:
             return await self.login_evnnpc(username, password)
 
         return CONF_ERR_UNKNOWN
 
     async def request_update(
-        self, evn_area: Area, username, password, customer_id, monthly_start=None
+        self,
+        evn_area: Area,
+        username,
+        password,
+        customer_id,
+        monthly_start=None,
+        sources=SOURCES,
+    ) -> dict[str, Any]:
+        """Request new update from EVN Server, corresponding with the last session
+
+        sources tells which of the consumption and billing data to request,
+        a single source is reused for its SOURCE_CACHE_TTL.
+        """
+
+        from_date, to_date = generate_datetime(1 if evn_area.get("name") == EVN_NAME.CPC else monthly_start, offset=1)
+        sources = tuple(sources)
+
+        key = (evn_area.get("name"), customer_id, "request_update", sources, from_date, to_date)
+
+        # Scheduled refreshes, manual refreshes and entity updates may overlap,
+        # identical requests share the one already in flight
+        request_update = partial(
+            async_get_single_flight(self.hass).run,
+            key,
+            partial(
+                self._request_update,
+                evn_area,
+                username,
+                password,
+                customer_id,
+                from_date,
+                to_date,
+                sources,
+            ),
+        )
+
+        if len(sources) == 1:
+            return await self._cached(
+                key, SOURCE_CACHE_TTL[sources[0]], request_update
+            )
+
+        return await request_update()
+
+    async def _request_update(
+        self, evn_area, username, password, customer_id, from_date, to_date, sources
+    ) -> dict[str, Any]:
+        """Request new update from EVN Server for the given date range
+
+        Once the billing period was fetched, only the days since the latest
+        reading are asked for, and merged into the readings kept so far.
+        """
+
+        window_from = from_date
+        kept = self._series.get(customer_id)
+
+        if (
+            SOURCE_CONSUMPTION in sources
+            and kept is not None
+            and kept["period"] == from_date
+            and kept["series"]
+        ):
+            window_from = max(
+                datetime.strptime(from_date, "%d/%m/%Y").date(),
+                kept["series"][-1].day - CONSUMPTION_OVERLAP,
+            ).strftime("%d/%m/%Y")
+
+        fetch_data = await self._request_area(
+            evn_area, username, password, customer_id, window_from, to_date, sources
+        )
+
+        if fetch_data["status"] != CONF_SUCCESS:
+            return fetch_data
+
+        if "series" in fetch_data:
+            fetch_data = self._merge_series(
+                customer_id, from_date, window_from != from_date, fetch_data
+            )
+
+        return formatted_result(fetch_data, sources)
+
+    def series(self, customer_id) -> list[DailyReading]:
+        """Return the daily readings kept for the billing period of a customer ID"""
+        return self._series.get(customer_id, {}).get("series", [])
+
+    def kept_series(self, customer_id) -> dict[str, Any] | None:
+        """Return the billing period kept for a customer ID, with its readings"""
+        return self._series.get(customer_id)
+
+    def keep_series(self, customer_id, kept: dict[str, Any]) -> None:
+        """Take over the billing period another API kept for a customer ID"""
+        self._series[customer_id] = {**kept, "series": list(kept["series"])}
+
+    def _merge_series(self, customer_id, period, incremental, fetch_data) -> dict:
+        """Merge the readings of a poll into those kept for the billing period
+
+        The totals of an incremental poll only cover its window, they are
+        rebuilt from the meter index the period started with.
+        """
+
+        kept = self._series.get(customer_id)
+
+        if not incremental or kept is None:
+            kept = self._series[customer_id] = {
+                "period": period,
+                "from_date": fetch_data["from_date"],
+                ID_ECON_TOTAL_OLD: fetch_data[ID_ECON_TOTAL_OLD],
+                "series": [],
+            }
+
+        kept["series"] = merge_series(kept["series"], fetch_data["series"])
+
+        if not incremental:
+            return fetch_data
+
+        return {
+            **fetch_data,
+            ID_ECON_TOTAL_OLD: kept[ID_ECON_TOTAL_OLD],
+            ID_ECON_MONTHLY_NEW: round(
+                fetch_data[ID_ECON_TOTAL_NEW] - kept[ID_ECON_TOTAL_OLD], 2
+            ),
+            "from_date": kept["from_date"],
+        }
+
+    async def request_series(
+        self, evn_area: Area, username, password, customer_id, from_date: date, to_date: date
+    ) -> dict[str, Any]:
+        """Request the daily readings of a date range from EVN Server
+
+        On success, "series" holds the DailyReading of each day of the range
+        that EVN has a reading for, oldest first.
+        """
+
+        if not supports_series(evn_area.get("name")):
+            return {"status": CONF_ERR_NOT_SUPPORTED, "data": evn_area.get("name")}
+
+        # Readings are published the day after, ask one more day for the last one
+        fetch_data = await self._request_area(
+            evn_area,
+            username,
+            password,
+            customer_id,
+            from_date.strftime("%d/%m/%Y"),
+            (to_date + timedelta(days=1)).strftime("%d/%m/%Y"),
+            (SOURCE_CONSUMPTION,),
+        )
+
+        if fetch_data["status"] != CONF_SUCCESS:
+            return fetch_data
+
+        return {
+            "status": CONF_SUCCESS,
+            "series": sorted(
+                (
+                    reading
+                    for reading in fetch_data["series"]
+                    if from_date <= reading.day <= to_date
+                ),
+                key=lambda reading: reading.day,
+            ),
+        }
+
+    async def _request_area(
+        self, evn_area, username, password, customer_id, from_date, to_date, sources
     ) -> dict[str, Any]:
-        """Request new update from EVN Server, corresponding with the last session"""
+        """Request the raw data of the given sources from the endpoints of an area"""
 
         self._evn_area = evn_area
+        self._start_retry_budget()
+
+        self._credentials = (username, password, customer_id)
+        await self._async_restore_session(username)
 
         fetch_data = {}        
         
-        from_date, to_date = generate_datetime(1 if evn_area.get("name") == EVN_NAME.CPC else monthly_start, offset=1)
-
         if evn_area.get("name") == EVN_NAME.CPC:
-            fetch_data = await self.request_update_evncpc(customer_id)
+            fetch_data = await self.request_update_evncpc(customer_id, sources)
             
         elif evn_area.get("name") == EVN_NAME.HANOI:            
             fetch_data = await self.request_update_evnhanoi(
-                username, password, customer_id, from_date, to_date
+                username, password, customer_id, from_date, to_date, sources
             )
 
         elif evn_area.get("name") == EVN_NAME.SPC:
             fetch_data = await self.request_update_evnspc(
-                customer_id, from_date, to_date
+                customer_id, from_date, to_date, sources
             )
 
         elif evn_area.get("name") == EVN_NAME.NPC:
             fetch_data = await self.request_update_evnnpc(
-                customer_id, from_date, to_date
+                customer_id, from_date, to_date, sources
             )
 
         elif evn_area.get("name") == EVN_NAME.HCMC:
             fetch_data = await self.request_update_evnhcmc(
-                username, password, customer_id, from_date, to_date
+                username, password, customer_id, from_date, to_date, sources
             )
 
-        if fetch_data["status"] == CONF_SUCCESS:
-            return formatted_result(fetch_data)
-
         return fetch_data
 
     async def login_evnhanoi(self, username, password) -> str:
@@ -154,8 +452,11 @@ class EVNAPI:
             "grant_type": "password",
         }
 
-        resp = await self._session.post(
-            url=self._evn_area.get("evn_login_url"), data=payload, headers=headers
+        resp = await self._request(
+            "POST",
+            url=self._evn_area.get("evn_login_url"),
+            data=payload,
+            headers=headers,
         )
 
         status, resp_json = await json_processing(resp)
@@ -166,10 +467,7 @@ class EVNAPI:
             return CONF_ERR_INVALID_AUTH
 
         elif "access_token" in resp_json:
-            self._evn_area["access_token"] = resp_json["access_token"]
-            if "expires_in" in resp_json:
-                expires_in = resp_json["expires_in"]
-                self._evn_area["token_expiry"] = time.time() + expires_in
+            self._set_access_token(resp_json["access_token"], resp_json)
             return CONF_SUCCESS
 
         _LOGGER.error(f"Error while logging in EVN Endpoints: {resp_json}")
@@ -187,9 +485,10 @@ class EVNAPI:
 
         payload = {"u": username, "p": password}
 
-        ssl_context = await self.hass.async_add_executor_job(create_ssl_context)
+        ssl_context = await async_get_ssl_context(self.hass, legacy=True)
 
-        resp = await self._session.post(
+        resp = await self._request(
+            "POST",
             url=self._evn_area.get("evn_login_url"),
             data=payload,
             ssl=ssl_context,
@@ -217,6 +516,7 @@ class EVNAPI:
                 self._evn_area["evn_session"] = evn_session
                 if expires:
                     self._evn_area["expires"] = expires.replace(tzinfo=timezone.utc)
+                    self._evn_area["token_expiry"] = self._evn_area["expires"].timestamp()
                     _LOGGER.info("Login successful. Session: %s", evn_session)
                     return CONF_SUCCESS
 
@@ -243,9 +543,10 @@ class EVNAPI:
             "Authorization": f"Basic {auth_header}",
         }
 
-        ssl_context = await self.hass.async_add_executor_job(create_ssl_context)
+        ssl_context = await async_get_ssl_context(self.hass, legacy=True)
 
-        resp = await self._session.post(
+        resp = await self._request(
+            "POST",
             url=self._evn_area.get("evn_login_url"),
             data=payload,
             headers=headers,
@@ -261,7 +562,7 @@ class EVNAPI:
         ):
             return CONF_ERR_INVALID_AUTH
 
-        self._evn_area["access_token"] = resp_json["access_token"]
+        self._set_access_token(resp_json["access_token"], resp_json)
         return CONF_SUCCESS
 
     async def login_evncpc(self, username, password) -> str:
@@ -285,8 +586,11 @@ class EVNAPI:
             "Connection": "keep-alive",
         }
 
-        resp = await self._session.post(
-            url=self._evn_area.get("evn_login_url"), data=payload, headers=headers
+        resp = await self._request(
+            "POST",
+            url=self._evn_area.get("evn_login_url"),
+            data=payload,
+            headers=headers,
         )
 
         status, resp_json = await json_processing(resp)
@@ -297,7 +601,7 @@ class EVNAPI:
             return CONF_ERR_INVALID_AUTH
 
         elif "access_token" in resp_json:
-            self._evn_area["access_token"] = resp_json["access_token"]
+            self._set_access_token(resp_json["access_token"], resp_json)
             return CONF_SUCCESS
 
         _LOGGER.error(f"Error while logging in EVN Endpoints: {resp_json}")
@@ -320,7 +624,8 @@ class EVNAPI:
             "Content-Type": "application/json; charset=utf-8",
         }
 
-        resp = await self._session.post(
+        resp = await self._request(
+            "POST",
             url=self._evn_area.get("evn_login_url"),
             data=json.dumps(payload),
             headers=headers,
@@ -338,16 +643,16 @@ class EVNAPI:
         if resp_json["maKH"] == "":
             return CONF_ERR_INVALID_AUTH
 
-        self._evn_area["access_token"] = resp_json["token"]
+        self._set_access_token(resp_json["token"], resp_json)
         return CONF_SUCCESS
 
     async def request_update_evnhanoi(
-        self, username, password, customer_id, from_date, to_date, last_index="001"
+        self, username, password, customer_id, from_date, to_date, sources=SOURCES
     ):
         """Request new update from EVNHANOI Server"""
 
         if self.is_token_expired():
-            login_status = await self.login_evnhanoi(username, password)
+            login_status = await self._login_once(username, password, customer_id)
             if login_status != CONF_SUCCESS:
                 raise ConfigEntryNotReady("Token expired and failed to reauthenticate")
                     
@@ -358,6 +663,30 @@ class EVNAPI:
             "Connection": "keep-alive",
         }
 
+        ssl_context = await async_get_ssl_context(self.hass)
+
+        return await self._request_sources(
+            sources,
+            consumption=[
+                partial(
+                    self._request_consumption_evnhanoi,
+                    customer_id, from_date, to_date, headers, ssl_context
+                ),
+            ],
+            billing=[
+                (
+                    partial(self._request_payment_evnhanoi, customer_id, headers, ssl_context),
+                    PAYMENT_UNKNOWN,
+                    "payment data",
+                ),
+            ],
+        )
+
+    async def _request_consumption_evnhanoi(
+        self, customer_id, from_date, to_date, headers, ssl_context, last_index="001"
+    ):
+        """Request e-consumption data from EVNHANOI Server"""
+
         data = {
             "maDiemDo": f"{customer_id}{last_index}",
             "maDonVi": f"{customer_id[0:6]}",
@@ -366,9 +695,8 @@ class EVNAPI:
             "ngayCuoi": to_date,
         }
 
-        ssl_context = await self.hass.async_add_executor_job(ssl.create_default_context)
-
-        resp = await self._session.post(
+        resp = await self._request(
+            "POST",
             url=self._evn_area.get("evn_data_url"),
             data=json.dumps(data),
             headers=headers,
@@ -385,8 +713,8 @@ class EVNAPI:
             if resp_json.get("code") == 400:
 
                 if last_index == "001":
-                    return await self.request_update_evnhanoi(
-                        username, password, customer_id, from_date, to_date, last_index="1"
+                    return await self._request_consumption_evnhanoi(
+                        customer_id, from_date, to_date, headers, ssl_context, last_index="1"
                     )
 
                 return {"status": CONF_ERR_INVALID_ID, "data": resp_json}
@@ -397,6 +725,9 @@ class EVNAPI:
 
         sub_data = resp_json["data"]["chiSoNgay"]
 
+        if not sub_data:
+            return {"status": CONF_EMPTY, "data": resp_json}
+
         from_date = parser.parse(sub_data[0]["ngay"], dayfirst=True)
         to_date = parser.parse(
             sub_data[(-1 if len(sub_data) > 1 else 0)]["ngay"], dayfirst=True
@@ -421,7 +752,7 @@ class EVNAPI:
             2,
         )
 
-        fetched_data = {
+        return {
             "status": CONF_SUCCESS,
             ID_ECON_TOTAL_OLD: econ_total_old,
             ID_ECON_TOTAL_NEW: econ_total_new,
@@ -431,14 +762,19 @@ class EVNAPI:
             "to_date": to_date.date(),
             "from_date": from_date.date(),
             "previous_date": previous_date.date(),
+            "series": daily_series_evnhanoi(sub_data),
         }
 
+    async def _request_payment_evnhanoi(self, customer_id, headers, ssl_context):
+        """Request payment status from EVNHANOI Server"""
+
         data = {
             "maKhachHang": customer_id,
             "maDonViQuanLy": f"{customer_id[0:6]}",
         }
 
-        resp = await self._session.post(
+        resp = await self._request(
+            "POST",
             url=self._evn_area.get("evn_payment_url"),
             data=json.dumps(data),
             headers=headers,
@@ -460,17 +796,23 @@ class EVNAPI:
             else:
                 payment_status = STATUS_N_PAYMENT_NEEDED
 
-        fetched_data.update(
-            {ID_PAYMENT_NEEDED: payment_status, ID_M_PAYMENT_NEEDED: m_payment_status}
-        )
+        return {ID_PAYMENT_NEEDED: payment_status, ID_M_PAYMENT_NEEDED: m_payment_status}
 
-        return fetched_data
+    def _set_access_token(self, token, resp_json) -> None:
+        """Store an access token along with its expiry, when it can be told"""
+
+        self._evn_area["access_token"] = token
+
+        if (expiry := token_expiry(token, resp_json)) is not None:
+            self._evn_area["token_expiry"] = expiry
+        else:
+            self._evn_area.pop("token_expiry", None)
 
     def is_token_expired(self) -> bool:
         expiry_time = self._evn_area.get("token_expiry", 0)
         return time.time() > expiry_time
 
-    async def request_update_evnhcmc(self, username, password, customer_id, from_date, to_date):
+    async def request_update_evnhcmc(self, username, password, customer_id, from_date, to_date, sources=SOURCES):
         """Request new update from EVNHCMC Server"""
 
         evn_session_expires = self._evn_area.get("expires")
@@ -480,12 +822,12 @@ class EVNAPI:
             evn_session_expires = None
 
         if not evn_session_expires:
-            login_status = await self.login_evnhcmc(username, password)
+            login_status = await self._login_once(username, password, customer_id)
             if login_status != CONF_SUCCESS:
                 raise ConfigEntryNotReady("Failed to reauthenticate due to invalid session expiration.")
         elif datetime.now(tz=timezone.utc) >= evn_session_expires:
             _LOGGER.info("Session expired. Attempting to login again...")
-            login_status = await self.login_evnhcmc(username, password)
+            login_status = await self._login_once(username, password, customer_id)
             if login_status != CONF_SUCCESS:
                 raise ConfigEntryNotReady("Session expired and failed to reauthenticate")       
 
@@ -497,9 +839,32 @@ class EVNAPI:
             "Cookie": f"evn_session={self._evn_area.get('evn_session')}",
         }
 
-        ssl_context = await self.hass.async_add_executor_job(ssl.create_default_context)
+        ssl_context = await async_get_ssl_context(self.hass)
+
+        return await self._request_sources(
+            sources,
+            consumption=[
+                partial(
+                    self._request_consumption_evnhcmc,
+                    customer_id, from_date, to_date, headers, ssl_context
+                ),
+            ],
+            billing=[
+                (
+                    partial(self._request_payment_evnhcmc, customer_id, headers, ssl_context),
+                    PAYMENT_UNKNOWN,
+                    "payment data",
+                ),
+            ],
+        )
 
-        resp = await self._session.post(
+    async def _request_consumption_evnhcmc(
+        self, customer_id, from_date, to_date, headers, ssl_context
+    ):
+        """Request e-consumption data from EVNHCMC Server"""
+
+        resp = await self._request(
+            "POST",
             url=self._evn_area.get("evn_data_url"),
             data={
                 "input_makh": customer_id,
@@ -527,6 +892,9 @@ class EVNAPI:
 
         resp_json = resp_json["data"]["sanluong_tungngay"]
 
+        if not resp_json:
+            return {"status": CONF_EMPTY, "data": resp_json}
+
         from_date = strip_date_range(resp_json[0]["ngayFull"])
         to_date = strip_date_range(
             resp_json[(-2 if len(resp_json) > 2 else 0)]["ngayFull"]
@@ -547,7 +915,7 @@ class EVNAPI:
             float(str(resp_json[0]["tong_p_giao"]).replace(",", "")), 2
         )
 
-        fetched_data = {
+        return {
             "status": CONF_SUCCESS,
             ID_ECON_TOTAL_OLD: econ_total_old,
             ID_ECON_TOTAL_NEW: econ_total_new,
@@ -571,9 +939,14 @@ class EVNAPI:
             "to_date": to_date.date(),
             "from_date": from_date.date(),
             "previous_date": previous_date.date(),
+            "series": daily_series_evnhcmc(resp_json),
         }
 
-        resp = await self._session.post(
+    async def _request_payment_evnhcmc(self, customer_id, headers, ssl_context):
+        """Request payment status from EVNHCMC Server"""
+
+        resp = await self._request(
+            "POST",
             url=self._evn_area.get("evn_payment_url"),
             data={"input_makh": customer_id},
             ssl=ssl_context,
@@ -599,23 +972,11 @@ class EVNAPI:
                 elif resp_json["data"].get("isNo") == 0:
                     payment_status = STATUS_N_PAYMENT_NEEDED
 
-        fetched_data.update(
-            {ID_PAYMENT_NEEDED: payment_status, ID_M_PAYMENT_NEEDED: m_payment_status}
-        )
-
-        return fetched_data
+        return {ID_PAYMENT_NEEDED: payment_status, ID_M_PAYMENT_NEEDED: m_payment_status}
 
-    async def request_update_evnnpc(
-        self, customer_id, from_date, to_date, last_index="001"
-    ):
+    async def request_update_evnnpc(self, customer_id, from_date, to_date, sources=SOURCES):
         """Request new update from EVNNPC Server"""
 
-        payload = {
-            "ma": f"{customer_id}{last_index}",
-            "start_intime": from_date.replace("/", "-"),
-            "stop_intime": to_date.replace("/", "-"),
-        }
-
         headers = {
             "User-Agent": "NPCApp/1 CFNetwork/1240.0.4 Darwin/20.6.0",
             "Content-Type": "application/json",
@@ -623,9 +984,38 @@ class EVNAPI:
             "Authorization": f"Bearer {self._evn_area.get('access_token')}",
         }
 
-        ssl_context = await self.hass.async_add_executor_job(ssl.create_default_context)
+        ssl_context = await async_get_ssl_context(self.hass)
+
+        return await self._request_sources(
+            sources,
+            consumption=[
+                partial(
+                    self._request_consumption_evnnpc,
+                    customer_id, from_date, to_date, headers, ssl_context
+                ),
+            ],
+            billing=[
+                (
+                    partial(self._request_payment_evnnpc, customer_id, headers, ssl_context),
+                    PAYMENT_UNKNOWN,
+                    "payment data",
+                ),
+            ],
+        )
+
+    async def _request_consumption_evnnpc(
+        self, customer_id, from_date, to_date, headers, ssl_context, last_index="001"
+    ):
+        """Request e-consumption data from EVNNPC Server"""
+
+        payload = {
+            "ma": f"{customer_id}{last_index}",
+            "start_intime": from_date.replace("/", "-"),
+            "stop_intime": to_date.replace("/", "-"),
+        }
 
-        resp = await self._session.post(
+        resp = await self._request(
+            "POST",
             url=self._evn_area.get("evn_data_url"),
             data=json.dumps(payload),
             headers=headers,
@@ -661,7 +1051,7 @@ class EVNAPI:
             valid_info[(1 if len(valid_info) > 1 else 0)]["THOI_GIAN_BAT_DAU"]
         )
 
-        fetched_data = {
+        return {
             "status": CONF_SUCCESS,
             ID_ECON_TOTAL_NEW: round(float(valid_info[0]["CHI_SO_KET_THUC"]), 2),
             ID_ECON_TOTAL_OLD: round(
@@ -682,9 +1072,14 @@ class EVNAPI:
             "from_date": from_date.date(),
             "to_date": to_date.date(),
             "previous_date": previous_date.date(),
+            "series": daily_series_evnnpc(valid_info),
         }
 
-        resp = await self._session.get(
+    async def _request_payment_evnnpc(self, customer_id, headers, ssl_context):
+        """Request payment status from EVNNPC Server"""
+
+        resp = await self._request(
+            "GET",
             url=f'{self._evn_area.get("evn_payment_url")}{customer_id}',
             headers=headers,
             ssl=ssl_context,
@@ -711,16 +1106,12 @@ class EVNAPI:
                             0
                         ].get("paymentTotalAmount")
 
-        fetched_data.update(
-            {
-                ID_PAYMENT_NEEDED: payment_status,
-                ID_M_PAYMENT_NEEDED: m_payment_status,
-            }
-        )
-
-        return fetched_data
+        return {
+            ID_PAYMENT_NEEDED: payment_status,
+            ID_M_PAYMENT_NEEDED: m_payment_status,
+        }
 
-    async def request_update_evncpc(self, customer_id):
+    async def request_update_evncpc(self, customer_id, sources=SOURCES):
         """Request new update from EVNCPC Server"""
 
         headers = {
@@ -731,7 +1122,29 @@ class EVNAPI:
             "Connection": "keep-alive",
         }
 
-        resp = await self._session.get(
+        # Unlike other areas, the meter index only comes with the payment data,
+        # both sources share that request for a while
+        request_home = partial(
+            self._cached,
+            (customer_id, "home"),
+            CPC_HOME_TTL,
+            partial(self._request_payment_evncpc, customer_id, headers),
+        )
+
+        return await self._request_sources(
+            sources,
+            consumption=[
+                partial(self._request_consumption_evncpc, customer_id, headers),
+                request_home,
+            ],
+            billing=[(request_home, PAYMENT_UNKNOWN, "payment data")],
+        )
+
+    async def _request_consumption_evncpc(self, customer_id, headers):
+        """Request e-consumption data from EVNCPC Server"""
+
+        resp = await self._request(
+            "GET",
             url=f"{self._evn_area.get('evn_data_url')}{customer_id}",
             headers=headers,
         )
@@ -741,7 +1154,7 @@ class EVNAPI:
         if status != CONF_SUCCESS:
             return resp_json
 
-        fetched_data = {
+        return {
             "status": CONF_SUCCESS,
             ID_ECON_DAILY_NEW: round(
                 float(resp_json["electricConsumption"]["electricConsumptionToday"]), 2
@@ -756,7 +1169,11 @@ class EVNAPI:
             ),
         }
 
-        resp = await self._session.get(
+    async def _request_payment_evncpc(self, customer_id, headers):
+        """Request payment status and meter index from EVNCPC Server"""
+
+        resp = await self._request(
+            "GET",
             url=f"{self._evn_area.get('evn_payment_url')}{customer_id}",
             headers=headers,
         )
@@ -792,40 +1209,32 @@ class EVNAPI:
         except Exception:
             to_date = datetime.now().date()
 
-        fetched_data.update(
-            {
-                ID_PAYMENT_NEEDED: payment_status,
-                ID_M_PAYMENT_NEEDED: m_payment_status,
-                ID_ECON_TOTAL_NEW: round(
-                    float(
-                        current_einfo.get("chiSo").replace(".", "").replace(",", ".")
-                    ),
-                    2,
+        return {
+            "status": CONF_SUCCESS,
+            ID_PAYMENT_NEEDED: payment_status,
+            ID_M_PAYMENT_NEEDED: m_payment_status,
+            ID_ECON_TOTAL_NEW: round(
+                float(
+                    current_einfo.get("chiSo").replace(".", "").replace(",", ".")
                 ),
-                ID_ECON_TOTAL_OLD: round(
-                    float(
-                        resp_json["response"]
-                        .get("chiSoCuoiKy")
-                        .replace(".", "")
-                        .replace(",", ".")
-                    ),
-                    2,
+                2,
+            ),
+            ID_ECON_TOTAL_OLD: round(
+                float(
+                    resp_json["response"]
+                    .get("chiSoCuoiKy")
+                    .replace(".", "")
+                    .replace(",", ".")
                 ),
-                "to_date": to_date,
-                "previous_date": to_date - timedelta(days=1),
-            }
-        )
-
-        return fetched_data
+                2,
+            ),
+            "to_date": to_date,
+            "previous_date": to_date - timedelta(days=1),
+        }
 
-    async def request_update_evnspc(
-        self, customer_id, from_date, to_date, last_index="001"
-    ):
+    async def request_update_evnspc(self, customer_id, from_date, to_date, sources=SOURCES):
         """Request new update from EVNSPC Server"""
 
-        from_date_str = (parser.parse(from_date, dayfirst=True) - timedelta(days=1)).strftime("%Y%m%d")
-        to_date_str = parser.parse(to_date, dayfirst=True).strftime("%Y%m%d")
-
         headers = {
             "User-Agent": "evnapp/59 CFNetwork/1240.0.4 Darwin/20.6.0",
             "Authorization": f"Bearer {self._evn_area.get('access_token')}",
@@ -835,7 +1244,37 @@ class EVNAPI:
             "Connection": "keep-alive",
         }
 
-        status, resp_json = await fetch_with_retries(
+        return await self._request_sources(
+            sources,
+            consumption=[
+                partial(
+                    self._request_consumption_evnspc,
+                    customer_id, from_date, to_date, headers
+                ),
+            ],
+            billing=[
+                (
+                    partial(self._request_payment_evnspc, customer_id, headers),
+                    PAYMENT_UNKNOWN,
+                    "payment data",
+                ),
+                (
+                    partial(self._request_loadshedding_evnspc, customer_id, headers),
+                    {ID_LOADSHEDDING: CONF_ERR_UNKNOWN},
+                    "loadshedding data",
+                ),
+            ],
+        )
+
+    async def _request_consumption_evnspc(
+        self, customer_id, from_date, to_date, headers, last_index="001"
+    ):
+        """Request e-consumption data from EVNSPC Server"""
+
+        from_date_str = (parser.parse(from_date, dayfirst=True) - timedelta(days=1)).strftime("%Y%m%d")
+        to_date_str = parser.parse(to_date, dayfirst=True).strftime("%Y%m%d")
+
+        status, resp_json = await self._fetch_json(
             url=self._evn_area.get("evn_data_url"),
             headers=headers,
             params={
@@ -843,13 +1282,15 @@ class EVNAPI:
                 "strFromDate": from_date_str,
                 "strToDate": to_date_str,
             },
-            session=self._session,
             api_name="Fetch EVN data"
         )
 
         if not resp_json:
             raise ValueError("Received empty response from EVN data API.")
 
+        if status != CONF_SUCCESS:
+            return resp_json
+
         from_date = parser.parse(resp_json[0]["strTime"], dayfirst=True) + timedelta(days=1)
         to_date = parser.parse(
             resp_json[(-1 if len(resp_json) > 1 else 0)]["strTime"], dayfirst=True
@@ -858,7 +1299,7 @@ class EVNAPI:
             resp_json[(-2 if len(resp_json) > 2 else 0)]["strTime"], dayfirst=True
         )
 
-        fetched_data = {
+        return {
             "status": CONF_SUCCESS,
             ID_ECON_TOTAL_OLD: round(safe_float(resp_json[0].get("dGiaoBT")), 2),
             ID_ECON_TOTAL_NEW: round(safe_float(resp_json[-1].get("dGiaoBT")), 2),
@@ -872,47 +1313,176 @@ class EVNAPI:
             "to_date": to_date.date(),
             "from_date": from_date.date(),
             "previous_date": previous_date.date(),
+            "series": daily_series_evnspc(resp_json),
         }
 
-        status, resp_json = await fetch_with_retries(
+    async def _request_payment_evnspc(self, customer_id, headers):
+        """Request payment status from EVNSPC Server"""
+
+        status, resp_json = await self._fetch_json(
             url=self._evn_area.get("evn_payment_url"),
             headers=headers,
             params={
                 "strMaKH": f"{customer_id}",
             },
-            session=self._session,
-            allow_empty=True,
             api_name="Payment data"
         )
 
         if status == CONF_SUCCESS and resp_json and isinstance(resp_json, list) and resp_json:
             m_payment_status = int(resp_json[0].get("lTongTien", 0))
-            fetched_data.update({
+            return {
                 ID_PAYMENT_NEEDED: STATUS_PAYMENT_NEEDED,
                 ID_M_PAYMENT_NEEDED: m_payment_status
-            })
-        else:
-            fetched_data.update({
-                ID_PAYMENT_NEEDED: STATUS_N_PAYMENT_NEEDED if status == CONF_EMPTY else CONF_ERR_UNKNOWN,
-                ID_M_PAYMENT_NEEDED: 0
-            })
+            }
+
+        return {
+            ID_PAYMENT_NEEDED: STATUS_N_PAYMENT_NEEDED if status == CONF_EMPTY else CONF_ERR_UNKNOWN,
+            ID_M_PAYMENT_NEEDED: 0
+        }
 
-        status, resp_json = await fetch_with_retries(
+    async def _request_loadshedding_evnspc(self, customer_id, headers):
+        """Request load-shedding schedule from EVNSPC Server"""
+
+        status, resp_json = await self._fetch_json(
             url=self._evn_area.get("evn_loadshedding_url"),
             headers=headers,
             params={
                 "strMaKH": f"{customer_id}",
             },
-            session=self._session,
             api_name="EVN loadshedding data"
         )
 
-        fetched_data[ID_LOADSHEDDING] = (
-            resp_json[0].get("strThoiGianMatDien") if resp_json else STATUS_LOADSHEDDING if status == CONF_EMPTY else CONF_ERR_UNKNOWN
+        return {
+            ID_LOADSHEDDING: (
+                resp_json[0].get("strThoiGianMatDien") if status == CONF_SUCCESS else STATUS_LOADSHEDDING if status == CONF_EMPTY else CONF_ERR_UNKNOWN
+            )
+        }
+
+    def _start_retry_budget(self) -> None:
+        """Give the current login or update, and the requests it spawns, a new retry budget"""
+        _RETRY_BUDGET.set(
+            RetryBudget(get_evn_area(self._evn_area.get("name")).retry.budget)
         )
 
+    async def _fetch_json(self, url, headers, params, api_name="EVN API"):
+        """Fetch a JSON payload from EVNSPC Endpoints"""
+
+        resp = await self._request(
+            "GET", url=url, headers=headers, params=params, ssl=False, api_name=api_name
+        )
+        status, resp_json = await json_processing(resp)
+
+        if status == CONF_EMPTY:
+            return CONF_EMPTY, []
+
+        return status, resp_json
+
+    async def _request(self, method, url, api_name="EVN API", **kwargs):
+        """Send a request to EVN Endpoints, following the retry, breaker and rate limit policies of the area"""
+
+        policy = get_evn_area(self._evn_area.get("name")).retry
+
+        return await async_request_with_retry(
+            self._session,
+            method,
+            url,
+            policy,
+            _RETRY_BUDGET.get(None) or RetryBudget(policy.budget),
+            async_get_circuit_breaker(self.hass, self._evn_area.get("name")),
+            async_get_rate_limiter(self.hass, self._evn_area.get("name")),
+            api_name,
+            **kwargs,
+        )
+
+    async def _request_sources(self, sources, consumption, billing):
+        """Request the consumption and billing data asked for, concurrently
+
+        consumption lists the requests that must all succeed, billing lists
+        (request, fallback, name) of each billing request. Along with
+        consumption, a failed billing request falls back instead of failing
+        the update.
+        """
+
+        requests = []
+
+        if SOURCE_CONSUMPTION in sources:
+            requests.extend(consumption)
+
+        if SOURCE_BILLING in sources:
+            requests.extend(request for request, _, _ in billing)
+
+        results = iter(await self._gather(*(request() for request in requests)))
+        fetched_data = {"status": CONF_SUCCESS}
+
+        if SOURCE_CONSUMPTION in sources:
+            for each_result in [next(results) for _ in consumption]:
+                if isinstance(each_result, Exception):
+                    raise each_result
+
+                if each_result["status"] != CONF_SUCCESS:
+                    return each_result
+
+                fetched_data.update(each_result)
+
+        if SOURCE_BILLING in sources:
+            for (_, fallback, api_name), each_result in zip(billing, results):
+                if SOURCE_CONSUMPTION not in sources:
+                    if isinstance(each_result, Exception):
+                        raise each_result
+
+                    if each_result.get("status", CONF_SUCCESS) != CONF_SUCCESS:
+                        return each_result
+
+                elif (
+                    not isinstance(each_result, Exception)
+                    and each_result.get("status", CONF_SUCCESS) != CONF_SUCCESS
+                ):
+                    each_result = fallback
+
+                fetched_data.update(secondary_result(each_result, fallback, api_name))
+
+            fetched_data["status"] = CONF_SUCCESS
+
         return fetched_data
 
+    async def _cached(self, key, ttl, call):
+        """Return the result of call, reusing the one of key while younger than ttl"""
+
+        now = time.monotonic()
+
+        for each_key, (expiry, task) in list(self._cache.items()):
+            if task.done() and expiry <= now:
+                del self._cache[each_key]
+
+        if (entry := self._cache.get(key)) is None:
+            task = asyncio.ensure_future(call())
+            entry = self._cache[key] = (now + ttl.total_seconds(), task)
+
+            @callback
+            def forget_failure(_task: asyncio.Future) -> None:
+                if (
+                    _task.cancelled()
+                    or _task.exception() is not None
+                    or _task.result().get("status", CONF_SUCCESS) != CONF_SUCCESS
+                ) and self._cache.get(key, (None, None))[1] is _task:
+                    del self._cache[key]
+
+            task.add_done_callback(forget_failure)
+
+        return dict(await asyncio.shield(entry[1]))
+
+    async def _gather(self, *requests):
+        """Run independent requests concurrently, bounded by MAX_CONCURRENT_REQUESTS"""
+
+        async def bounded(request):
+            async with self._request_limit:
+                return await request
+
+        # A failed request must not cancel the others, its exception is returned instead
+        return await asyncio.gather(
+            *(bounded(request) for request in requests), return_exceptions=True
+        )
+
     async def get_evn_info(self, customer_id):
         """Get EVN branch info"""
         file_path = os.path.join(os.path.dirname(__file__), "evn_branches.json")
@@ -968,12 +1538,21 @@ async def json_processing(resp):
 
     return CONF_SUCCESS, resp_json
 
-def formatted_result(raw_data: dict) -> dict:
+def formatted_result(raw_data: dict, sources=SOURCES) -> dict:
+    res = {"status": CONF_SUCCESS}
+
+    if SOURCE_CONSUMPTION in sources:
+        res.update(formatted_consumption(raw_data))
+
+    if SOURCE_BILLING in sources:
+        res.update(formatted_billing(raw_data))
+
+    return res
+
+def formatted_consumption(raw_data: dict) -> dict:
     res = {}
     time_obj = datetime.now()
 
-    res["status"] = CONF_SUCCESS
-
     res[ID_ECON_TOTAL_NEW] = {
         "value": raw_data[ID_ECON_TOTAL_NEW],
         "info": raw_data["to_date"],
@@ -988,7 +1567,17 @@ def formatted_result(raw_data: dict) -> dict:
             "value": raw_data[ID_ECON_MONTHLY_NEW],
         }
         res[ID_ECOST_MONTHLY_NEW] = {
-            "value": calc_ecost(raw_data[ID_ECON_MONTHLY_NEW]),
+            "value": (
+                TARIFFS.cost(
+                    raw_data[ID_ECON_MONTHLY_NEW],
+                    raw_data[ID_FROM_DATE],
+                    raw_data["to_date"],
+                )
+                if ID_FROM_DATE in raw_data
+                else TARIFFS.tariff(raw_data["to_date"]).cost(
+                    raw_data[ID_ECON_MONTHLY_NEW]
+                )
+            ),
         }
 
     if raw_data[ID_ECON_DAILY_NEW] is not None:
@@ -1001,7 +1590,9 @@ def formatted_result(raw_data: dict) -> dict:
 
         res[ID_ECON_DAILY_NEW] = {"value": raw_data[ID_ECON_DAILY_NEW], "info": info}
         res[ID_ECOST_DAILY_NEW] = {
-            "value": calc_ecost(raw_data[ID_ECON_DAILY_NEW]),
+            "value": TARIFFS.tariff(raw_data["to_date"]).cost(
+                raw_data[ID_ECON_DAILY_NEW]
+            ),
             "info": info,
         }
 
@@ -1015,10 +1606,27 @@ def formatted_result(raw_data: dict) -> dict:
 
         res[ID_ECON_DAILY_OLD] = {"value": raw_data[ID_ECON_DAILY_OLD], "info": info}
         res[ID_ECOST_DAILY_OLD] = {
-            "value": calc_ecost(raw_data[ID_ECON_DAILY_OLD]),
+            "value": TARIFFS.tariff(raw_data["previous_date"]).cost(
+                raw_data[ID_ECON_DAILY_OLD]
+            ),
             "info": info,
         }
 
+    if ID_FROM_DATE in raw_data:
+        res[ID_FROM_DATE] = {"value": raw_data.get("from_date").strftime("%d/%m/%Y")}
+    else:
+        first_day_of_month = datetime.now().replace(day=1)
+        res[ID_FROM_DATE] = {"value": first_day_of_month.strftime("%d/%m/%Y")}
+
+    res[ID_TO_DATE] = {"value": raw_data.get("to_date").strftime("%d/%m/%Y")}
+
+    res[ID_LATEST_UPDATE] = {"value": time_obj.astimezone()}
+
+    return res
+
+def formatted_billing(raw_data: dict) -> dict:
+    res = {}
+
     res[ID_PAYMENT_NEEDED] = {
         "value": (
             None
@@ -1063,16 +1671,6 @@ def formatted_result(raw_data: dict) -> dict:
         "info": "mdi:transmission-tower-off",
     }
 
-    if ID_FROM_DATE in raw_data:
-        res[ID_FROM_DATE] = {"value": raw_data.get("from_date").strftime("%d/%m/%Y")}
-    else:
-        first_day_of_month = datetime.now().replace(day=1)
-        res[ID_FROM_DATE] = {"value": first_day_of_month.strftime("%d/%m/%Y")}
-
-    res[ID_TO_DATE] = {"value": raw_data.get("to_date").strftime("%d/%m/%Y")}
-
-    res[ID_LATEST_UPDATE] = {"value": time_obj.astimezone()}
-
     return res
 
 def get_evn_info(evn_customer_id: str):
@@ -1096,7 +1694,7 @@ def get_evn_info(evn_customer_id: str):
                 return {
                     "status": CONF_SUCCESS,
                     "customer_id": evn_customer_id,
-                    "evn_area": asdict(each_area),
+                    "evn_area": each_area.entry_data(),
                     "evn_name": each_area.name,
                     "evn_location": each_area.location,
                     "evn_branch": evn_branch,
@@ -1153,28 +1751,83 @@ def generate_datetime(monthly_start=1, offset=0):
 
     return from_date, to_date
 
-def calc_ecost(kwh: float) -> str:
-    """Calculate electric cost based on e-consumption"""
+def supports_series(area_name: str) -> bool:
+    """Return whether an EVN area serves the daily readings of any date range"""
 
-    total_price = 0.0
+    # EVNCPC only reports today, yesterday and this month
+    return area_name != EVN_NAME.CPC
 
-    e_stage_list = list(VIETNAM_ECOST_STAGES.keys())
+def daily_series_evnhanoi(rows) -> list[DailyReading]:
+    """Return the daily readings of EVNHANOI chiSoNgay rows
 
-    for index, e_stage in enumerate(e_stage_list):
-        if kwh < e_stage:
-            break
+    Each row holds the meter index at the start of its day, the previous
+    day used the difference with the row before.
+    """
 
-        if e_stage == e_stage_list[-1]:
-            total_price += (kwh - e_stage) * VIETNAM_ECOST_STAGES[e_stage]
-        else:
-            next_stage = e_stage_list[index + 1]
-            total_price += (
-                (next_stage - e_stage) if kwh > next_stage else (kwh - e_stage)
-            ) * VIETNAM_ECOST_STAGES[e_stage]
+    series = []
+
+    for previous, row in zip(rows, rows[1:]):
+        series.append(
+            DailyReading(
+                day=(parser.parse(row["ngay"], dayfirst=True) - timedelta(days=1)).date(),
+                index=round(safe_float(row["sg"]), 2),
+                consumption=round(safe_float(row["sg"]) - safe_float(previous["sg"]), 2),
+            )
+        )
 
-    total_price = int(round((total_price / 100) * (100 + VIETNAM_ECOST_VAT)))
+    return series
+
+def daily_series_evnhcmc(rows) -> list[DailyReading]:
+    """Return the daily readings of EVNHCMC sanluong_tungngay rows
+
+    The last row is the day in progress and is left out.
+    """
+
+    return [
+        DailyReading(
+            day=strip_date_range(row["ngayFull"]).date(),
+            index=round(safe_float(row.get("tong_p_giao")), 2),
+            consumption=round(safe_float(row.get("Tong")), 2),
+        )
+        for row in rows[:-1]
+    ]
 
-    return str(total_price)
+def daily_series_evnnpc(rows) -> list[DailyReading]:
+    """Return the daily readings of EVNNPC dailyconsump rows, newest first"""
+
+    return [
+        DailyReading(
+            day=parser.parse(row["THOI_GIAN_BAT_DAU"]).date(),
+            index=round(safe_float(row.get("CHI_SO_KET_THUC")), 2),
+            consumption=round(safe_float(row.get("SAN_LUONG")), 2),
+        )
+        for row in reversed(rows)
+    ]
+
+def daily_series_evnspc(rows) -> list[DailyReading]:
+    """Return the daily readings of EVNSPC LayThongTinSanLuongTheoNgay_v1 rows
+
+    The first row is the day before the requested range and is left out.
+    """
+
+    return [
+        DailyReading(
+            day=parser.parse(row["strTime"], dayfirst=True).date(),
+            index=round(safe_float(row.get("dGiaoBT")), 2),
+            consumption=round(safe_float(row.get("dSanLuongBT")), 2),
+        )
+        for row in rows[1:]
+    ]
+
+def merge_series(
+    series: list[DailyReading], new_series: list[DailyReading]
+) -> list[DailyReading]:
+    """Merge two daily series, oldest first, newer readings replacing older ones"""
+
+    merged = {reading.day: reading for reading in series}
+    merged.update((reading.day, reading) for reading in new_series)
+
+    return [merged[day] for day in sorted(merged)]
 
 def safe_float(value, default=0.0):
     try:
@@ -1213,27 +1866,28 @@ def strip_date_range(date_str):
         stripped_date = date_str.strip()
     return parser.parse(stripped_date, dayfirst=True)
 
-async def fetch_with_retries(
-    url, headers, params, max_retries=3, session=None, allow_empty=False, api_name="API"
-):
-    """Fetch data with retry mechanism."""
-    for attempt in range(max_retries):
-        try:
-            resp = await session.get(url=url, headers=headers, params=params, ssl=False)
-            status, resp_json = await json_processing(resp)
-            
-            if status == CONF_EMPTY:
-                return CONF_EMPTY, []
+def token_expiry(token: str, resp_json: dict) -> float | None:
+    """Work out when an access token expires, from expires_in or its JWT exp claim"""
 
-            if status == CONF_SUCCESS or (allow_empty and status == CONF_EMPTY):
-                return status, resp_json
-            
-            _LOGGER.error(f"Attempt {attempt + 1}/{max_retries} failed for {api_name}: {resp_json}")
-        
-        except Exception as e:
-            _LOGGER.error(f"Attempt {attempt + 1}/{max_retries} encountered an error: {str(e)}")
+    if resp_json.get("expires_in"):
+        return time.time() + float(resp_json["expires_in"])
+
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
+
+def secondary_result(result, fallback: dict, api_name: str) -> dict:
+    """Return the result of a secondary request, or its fallback if it failed"""
+
+    if isinstance(result, Exception):
+        _LOGGER.warning(f"Unable to fetch {api_name} from EVN Server: {result}")
+        return fallback
 
-    raise Exception(f"Failed to fetch data of {api_name} after {max_retries} attempts.")
+    return result
 
 def get_evn_info_sync(customer_id: str, branches_data=None):
     """Synchronous helper to get EVN info"""
@@ -1250,7 +1904,7 @@ def get_evn_info_sync(customer_id: str, branches_data=None):
                 return {
                     "status": CONF_SUCCESS,
                     "customer_id": customer_id,
-                    "evn_area": asdict(each_area),
+                    "evn_area": each_area.entry_data(),
                     "evn_name": each_area.name,
                     "evn_location": each_area.location,
                     "evn_branch": evn_branch,
@@ -0,0 +1,149 @@
+"""Domain-wide queue bounding the refreshes running at once."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+import heapq
+import itertools
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    DATA_REFRESH_QUEUE,
+    DEFAULT_REFRESH_CONCURRENCY,
+    DOMAIN,
+    PRIORITY_BACKFILL,
+    PRIORITY_SCHEDULED,
+    PRIORITY_USER,
+    REFRESH_SLOW_WAIT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Priority of the refresh running in the current task, set by whoever
+# started it and read when it queues its work
+REFRESH_PRIORITY: ContextVar[int] = ContextVar(
+    "evn_refresh_priority", default=PRIORITY_SCHEDULED
+)
+
+PRIORITY_NAMES = {
+    PRIORITY_USER: "user",
+    PRIORITY_SCHEDULED: "scheduled",
+    PRIORITY_BACKFILL: "backfill",
+}
+
+
+class RefreshQueue:
+    """Run at most a fixed number of refreshes at once, most urgent first"""
+
+    def __init__(self, concurrency: int = DEFAULT_REFRESH_CONCURRENCY) -> None:
+        """Construct the queue, empty."""
+        self.concurrency = concurrency
+        self._running = 0
+        # Waiting refreshes as (priority, order, future), order keeps
+        # refreshes of the same priority first in, first out
+        self._waiting: list[tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._peak_depth = 0
+        self._waits = {
+            priority: {"count": 0, "total": 0.0, "max": 0.0}
+            for priority in PRIORITY_NAMES
+        }
+
+    @property
+    def depth(self) -> int:
+        """Return the number of refreshes waiting for their turn."""
+        return sum(not future.done() for _, _, future in self._waiting)
+
+    @property
+    def attributes(self) -> dict[str, Any]:
+        """Return queue metrics for diagnostics."""
+        return {
+            "concurrency": self.concurrency,
+            "running": self._running,
+            "queued": self.depth,
+            "peak_queued": self._peak_depth,
+            "waits": {
+                PRIORITY_NAMES[priority]: {
+                    "refreshes": waits["count"],
+                    "average_wait": round(waits["total"] / max(waits["count"], 1), 2),
+                    "max_wait": round(waits["max"], 2),
+                }
+                for priority, waits in self._waits.items()
+            },
+        }
+
+    @asynccontextmanager
+    async def slot(self, priority: int | None = None) -> AsyncIterator[None]:
+        """Hold one of the refresh slots, waiting for it behind more urgent work."""
+
+        if priority is None:
+            priority = REFRESH_PRIORITY.get()
+
+        started = time.monotonic()
+
+        if self._running >= self.concurrency or self.depth:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiting, (priority, next(self._order), future))
+            self._peak_depth = max(self._peak_depth, self.depth)
+
+            try:
+                await future
+            except asyncio.CancelledError:
+                # Handed a slot just as it was cancelled, pass it on
+                if future.done() and not future.cancelled():
+                    self._release()
+                raise
+        else:
+            self._running += 1
+
+        self._record_wait(priority, time.monotonic() - started)
+
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        """Hand the slot over to the most urgent waiting refresh."""
+
+        while self._waiting:
+            _, _, future = heapq.heappop(self._waiting)
+
+            if not future.done():
+                future.set_result(None)
+                return
+
+        self._running -= 1
+
+    def _record_wait(self, priority: int, wait: float) -> None:
+        waits = self._waits[priority]
+        waits["count"] += 1
+        waits["total"] += wait
+        waits["max"] = max(waits["max"], wait)
+
+        if wait >= REFRESH_SLOW_WAIT:
+            _LOGGER.debug(
+                "A %s refresh waited %.1fs for its turn, %s refreshes still queued",
+                PRIORITY_NAMES[priority],
+                wait,
+                self.depth,
+            )
+
+
+@callback
+def async_get_refresh_queue(hass: HomeAssistant) -> RefreshQueue:
+    """Return the refresh queue shared by every config entry."""
+
+    domain_data = hass.data.setdefault(DOMAIN, {})
+
+    if (queue := domain_data.get(DATA_REFRESH_QUEUE)) is None:
+        queue = domain_data[DATA_REFRESH_QUEUE] = RefreshQueue()
+
+    return queue
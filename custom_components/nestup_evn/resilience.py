@@ -0,0 +1,425 @@
+"""Retry and failure handling for requests to EVN Endpoints."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+import logging
+import random
+import time
+from typing import Any
+
+import aiohttp
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import (
+    BREAKER_CLOSED,
+    BREAKER_HALF_OPEN,
+    BREAKER_OPEN,
+    DATA_CIRCUIT_BREAKERS,
+    DATA_RATE_LIMITERS,
+    DATA_SINGLE_FLIGHT,
+    DOMAIN,
+    REQUEST_WAIT_PUBLISH_INTERVAL,
+)
+from .types import BreakerPolicy, RateLimitPolicy, RetryPolicy, get_evn_area
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class EVNRequestError(Exception):
+    """Base error for requests to EVN Endpoints."""
+
+
+class EVNRetryError(EVNRequestError):
+    """Request still failed after every allowed attempt."""
+
+    def __init__(self, message: str, status: int | None = None) -> None:
+        """Construct the error, with the status code of the last response if any."""
+        super().__init__(message)
+        self.status = status
+
+
+class EVNCircuitOpenError(EVNRequestError):
+    """EVN area is failing, requests are short-circuited until it recovers."""
+
+
+class AreaHealth:
+    """Area-wide state that entities can listen to"""
+
+    def __init__(self) -> None:
+        """Construct the listener registry."""
+        self._listeners: list[CALLBACK_TYPE] = []
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> Callable[[], None]:
+        """Listen for state changes, return a function removing the listener."""
+
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_notify(self) -> None:
+        """Call every listener."""
+        for update_callback in list(self._listeners):
+            update_callback()
+
+
+class CircuitBreaker(AreaHealth):
+    """Fail fast while an EVN area keeps failing, shared by all its entries"""
+
+    def __init__(self, name: str, policy: BreakerPolicy) -> None:
+        """Construct the circuit breaker, closed."""
+        super().__init__()
+        self.name = name
+        self._policy = policy
+        self._state = BREAKER_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started = 0.0
+
+    @property
+    def state(self) -> str:
+        """Return the current state."""
+        return self._state
+
+    @property
+    def attributes(self) -> dict[str, Any]:
+        """Return details for diagnostics."""
+
+        retry_in = 0
+
+        if self._state == BREAKER_OPEN:
+            retry_in = max(
+                0, round(self._opened_at + self._policy.cooldown - time.monotonic())
+            )
+
+        return {
+            "consecutive_failures": self._failures,
+            "failure_threshold": self._policy.failure_threshold,
+            "retry_in": retry_in,
+        }
+
+    def before_request(self) -> None:
+        """Raise if the request must not be sent."""
+
+        now = time.monotonic()
+
+        if self._state == BREAKER_CLOSED:
+            return
+
+        if self._state == BREAKER_OPEN:
+            if now - self._opened_at < self._policy.cooldown:
+                raise EVNCircuitOpenError(
+                    f"{self.name} is unreachable, waiting before trying again"
+                )
+
+            self._set_state(BREAKER_HALF_OPEN)
+            self._probe_started = now
+            return
+
+        # Half-open, a single probe is in flight. A probe that never
+        # reported back (e.g. cancelled) is replaced after the cool-down
+        if now - self._probe_started < self._policy.cooldown:
+            raise EVNCircuitOpenError(f"{self.name} is being probed, try again later")
+
+        self._probe_started = now
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+
+        self._failures = 0
+
+        if self._state != BREAKER_CLOSED:
+            _LOGGER.info("%s is reachable again", self.name)
+            self._set_state(BREAKER_CLOSED)
+
+    def record_failure(self) -> None:
+        """Count a failed request, opening the circuit past the threshold."""
+
+        self._failures += 1
+
+        if self._state == BREAKER_HALF_OPEN or (
+            self._state == BREAKER_CLOSED
+            and self._failures >= self._policy.failure_threshold
+        ):
+            _LOGGER.warning(
+                "%s failed %s times in a row, pausing requests for %ss",
+                self.name,
+                self._failures,
+                self._policy.cooldown,
+            )
+            self._opened_at = time.monotonic()
+            self._set_state(BREAKER_OPEN)
+
+    def _set_state(self, state: str) -> None:
+        self._state = state
+        self.async_notify()
+
+
+class TokenBucket(AreaHealth):
+    """Queue outbound requests of an EVN area to a steady rate, shared by all its entries"""
+
+    def __init__(self, name: str, policy: RateLimitPolicy) -> None:
+        """Construct the bucket, full."""
+        super().__init__()
+        self.name = name
+        self._policy = policy
+        self._tokens = float(policy.burst)
+        self._updated = time.monotonic()
+        # asyncio.Lock wakes waiters in FIFO order, so requests keep their turn
+        self._lock = asyncio.Lock()
+        self._queued = 0
+        self._requests = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self.last_wait = 0.0
+        # Waits are published at most once per interval, every request
+        # would otherwise write the state of the area's sensors
+        self._published_wait = 0.0
+        self._publish_handle: asyncio.TimerHandle | None = None
+
+    @property
+    def attributes(self) -> dict[str, Any]:
+        """Return queue metrics for diagnostics."""
+        return {
+            "queued": self._queued,
+            "requests": self._requests,
+            "average_wait": round(self._total_wait / max(self._requests, 1), 2),
+            "max_wait": round(self._max_wait, 2),
+            "rate": self._policy.rate,
+            "burst": self._policy.burst,
+        }
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+
+        started = time.monotonic()
+        self._queued += 1
+
+        try:
+            async with self._lock:
+                self._refill()
+
+                if self._tokens < 1:
+                    await asyncio.sleep((1 - self._tokens) / self._policy.rate)
+                    self._refill()
+
+                self._tokens -= 1
+        finally:
+            self._queued -= 1
+
+        wait = time.monotonic() - started
+
+        self._requests += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+        self.last_wait = round(wait, 2)
+
+        if self.last_wait != self._published_wait and self._publish_handle is None:
+            self._publish_handle = asyncio.get_running_loop().call_later(
+                REQUEST_WAIT_PUBLISH_INTERVAL, self._async_publish
+            )
+
+    @callback
+    def _async_publish(self) -> None:
+        """Notify listeners of the latest wait, unless it is already published."""
+
+        self._publish_handle = None
+
+        if self.last_wait != self._published_wait:
+            self._published_wait = self.last_wait
+            self.async_notify()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            float(self._policy.burst),
+            self._tokens + (now - self._updated) * self._policy.rate,
+        )
+        self._updated = now
+
+
+def _async_get_area_state(hass: HomeAssistant, key: str, area_name: str, factory):
+    """Return the object of an EVN area kept under key, creating it if needed."""
+
+    registry = hass.data.setdefault(DOMAIN, {}).setdefault(key, {})
+
+    if (state := registry.get(area_name)) is None:
+        state = registry[area_name] = factory(area_name, get_evn_area(area_name))
+
+    return state
+
+
+@callback
+def async_get_circuit_breaker(hass: HomeAssistant, area_name: str) -> CircuitBreaker:
+    """Return the circuit breaker shared by every entry of an EVN area."""
+    return _async_get_area_state(
+        hass,
+        DATA_CIRCUIT_BREAKERS,
+        area_name,
+        lambda name, area: CircuitBreaker(name, area.breaker),
+    )
+
+
+@callback
+def async_get_rate_limiter(hass: HomeAssistant, area_name: str) -> TokenBucket:
+    """Return the rate limiter shared by every entry of an EVN area."""
+    return _async_get_area_state(
+        hass,
+        DATA_RATE_LIMITERS,
+        area_name,
+        lambda name, area: TokenBucket(name, area.rate_limit),
+    )
+
+
+class SingleFlight:
+    """Share one in-flight call between every caller asking for the same key"""
+
+    def __init__(self) -> None:
+        """Construct the registry of in-flight calls."""
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the result of call, or of the identical call already in flight."""
+
+        if (task := self._calls.get(key)) is None:
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+
+            @callback
+            def forget(_task: asyncio.Future) -> None:
+                if self._calls.get(key) is _task:
+                    del self._calls[key]
+
+            task.add_done_callback(forget)
+
+        else:
+            _LOGGER.debug("Joining request already in flight: %s", key)
+
+        # A cancelled caller must not cancel the call shared with the others
+        return await asyncio.shield(task)
+
+    @property
+    def in_flight(self) -> int:
+        """Return the number of calls in flight."""
+        return len(self._calls)
+
+
+@callback
+def async_get_single_flight(hass: HomeAssistant) -> SingleFlight:
+    """Return the single-flight registry shared by every config entry."""
+
+    domain_data = hass.data.setdefault(DOMAIN, {})
+
+    if (single_flight := domain_data.get(DATA_SINGLE_FLIGHT)) is None:
+        single_flight = domain_data[DATA_SINGLE_FLIGHT] = SingleFlight()
+
+    return single_flight
+
+
+class RetryBudget:
+    """Retries left for one login or update, shared by its requests"""
+
+    def __init__(self, retries: int) -> None:
+        """Construct the budget."""
+        self.remaining = retries
+
+    def consume(self) -> bool:
+        """Take one retry from the budget if any is left."""
+
+        if self.remaining <= 0:
+            return False
+
+        self.remaining -= 1
+        return True
+
+
+def backoff_delay(policy: RetryPolicy, attempt: int) -> float:
+    """Exponential backoff with full jitter for the given attempt (from 1)"""
+
+    return random.uniform(
+        0, min(policy.max_delay, policy.base_delay * 2 ** (attempt - 1))
+    )
+
+
+async def async_request_with_retry(
+    session: aiohttp.ClientSession,
+    method: str,
+    url: str,
+    policy: RetryPolicy,
+    budget: RetryBudget,
+    breaker: CircuitBreaker,
+    limiter: TokenBucket,
+    api_name: str = "EVN API",
+    **kwargs,
+) -> aiohttp.ClientResponse:
+    """Send a request, retrying connection errors and retryable status codes.
+
+    The response is returned once its status is not retryable, it is up to
+    the caller to handle the status code. EVNRetryError is raised once no
+    attempt is left, with the status code of the last response if any.
+    Each attempt waits for its turn in the area's rate limiter, and
+    EVNCircuitOpenError is raised without sending anything while the area is down.
+    """
+
+    attempt = 0
+
+    while True:
+        attempt += 1
+        can_retry = attempt < policy.attempts
+
+        breaker.before_request()
+        await limiter.acquire()
+
+        try:
+            resp = await session.request(method, url, **kwargs)
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            breaker.record_failure()
+
+            if not (can_retry and budget.consume()):
+                raise EVNRetryError(
+                    f"Failed to request {api_name} after {attempt} attempt(s): {error!r}"
+                ) from error
+
+            reason = repr(error)
+
+        else:
+            if resp.status in policy.retry_statuses:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+            if resp.status not in policy.retry_statuses:
+                return resp
+
+            resp.release()
+
+            if not (can_retry and budget.consume()):
+                raise EVNRetryError(
+                    f"Failed to request {api_name} after {attempt} attempt(s): "
+                    f"status code {resp.status}",
+                    resp.status,
+                )
+
+            reason = f"status code {resp.status}"
+
+        delay = backoff_delay(policy, attempt)
+
+        _LOGGER.debug(
+            "Attempt %s/%s for %s failed (%s), retrying in %.1fs",
+            attempt,
+            policy.attempts,
+            api_name,
+            reason,
+            delay,
+        )
+
+        await asyncio.sleep(delay)
@@ -0,0 +1,177 @@
+"""Polling schedule following when EVN publishes daily readings."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime, timedelta
+import random
+from typing import Any
+import zlib
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    AUTH_SAVE_DELAY,
+    DATA_PUBLISH_SCHEDULE,
+    DOMAIN,
+    EVN_TIME_ZONE,
+    POLL_DENSE_INTERVAL,
+    POLL_IDLE_INTERVAL,
+    POLL_JITTER,
+    POLL_LATE_INTERVAL,
+    POLL_LEARN_INTERVAL,
+    POLL_STAGGER_STEP,
+    PUBLISH_MARGIN,
+    PUBLISH_SAMPLES,
+    STARTUP_SPREAD,
+    STORAGE_KEY_SCHEDULE,
+    STORAGE_VERSION,
+)
+
+
+def evn_now() -> datetime:
+    """Return the current time in Vietnam."""
+    return dt_util.now(dt_util.get_time_zone(EVN_TIME_ZONE))
+
+
+def phase(key: str) -> float:
+    """Return a fraction in [0, 1) fixed for key, across restarts too."""
+    return zlib.crc32(key.encode()) / 2**32
+
+
+def startup_delay(key: str) -> float:
+    """Return the seconds to wait before the first fetch of key."""
+    return phase(key) * STARTUP_SPREAD.total_seconds()
+
+
+def staggered_interval(key: str, interval: timedelta, now: datetime) -> timedelta:
+    """Move a polling interval onto the time grid of key, with some jitter.
+
+    The next poll is moved to the nearest point of a grid shifted by the
+    phase of key, its step being the interval capped at POLL_STAGGER_STEP.
+    Entries sharing an interval then stay apart instead of firing together,
+    and long waits are moved by at most half a step.
+    """
+
+    step = min(interval, POLL_STAGGER_STEP).total_seconds()
+    offset = phase(key) * step
+    target = now.timestamp() + interval.total_seconds()
+    next_poll = round((target - offset) / step) * step + offset
+
+    jitter = random.uniform(-1, 1) * min(POLL_JITTER.total_seconds(), step / 10)
+
+    return timedelta(seconds=max(next_poll - now.timestamp() + jitter, step / 2))
+
+
+class PublishSchedule:
+    """Times of day each EVN area moved its latest reading forward, kept across restarts"""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Construct the schedule, loaded on first use."""
+        self.hass = hass
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY_SCHEDULE)
+        # Per area, "samples" are minutes of the day and "lag" is the number
+        # of days between the publish date and the latest reading
+        self._areas: dict[str, dict[str, Any]] = {}
+        # Latest reading seen since start-up, an advance is only timed
+        # when it happens between two polls of this run
+        self._latest: dict[str, date] = {}
+        self._load_task: asyncio.Task | None = None
+
+    async def async_observe(self, area_name: str, latest: date, now: datetime) -> None:
+        """Record the latest reading of an area, timing it if it moved forward."""
+
+        await self._async_load()
+
+        previous = self._latest.get(area_name)
+        self._latest[area_name] = max(latest, previous or latest)
+
+        if previous is None or latest <= previous:
+            return
+
+        area = self._areas.setdefault(area_name, {"samples": [], "lag": 1})
+        area["samples"] = [*area["samples"], now.hour * 60 + now.minute][
+            -PUBLISH_SAMPLES:
+        ]
+        area["lag"] = max((now.date() - latest).days, 0)
+
+        self._store.async_delay_save(self._data_to_save, AUTH_SAVE_DELAY)
+
+    def window(self, area_name: str) -> tuple[int, int] | None:
+        """Return the first and last minute of the day an area published at."""
+
+        if not (samples := self._areas.get(area_name, {}).get("samples")):
+            return None
+
+        return min(samples), max(samples)
+
+    def next_interval(
+        self, area_name: str, latest: date | None, now: datetime
+    ) -> timedelta:
+        """Return how long to wait before polling an area again.
+
+        Polls are dense around the publish window until the day's reading
+        is in, then back off until the next window. Until the window is
+        learned, polls stay as sparse as the fixed interval they replace.
+        """
+
+        if latest is None:
+            return POLL_LEARN_INTERVAL
+
+        lag = self._areas.get(area_name, {}).get("lag", 1)
+        published = (now.date() - latest).days <= lag
+
+        if (window := self.window(area_name)) is None:
+            return POLL_IDLE_INTERVAL if published else POLL_LEARN_INTERVAL
+
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        opens = midnight + timedelta(minutes=window[0]) - PUBLISH_MARGIN
+        closes = midnight + timedelta(minutes=window[1]) + PUBLISH_MARGIN
+
+        if published:
+            if now >= opens:
+                opens += timedelta(days=1)
+
+            return _clamp(opens - now)
+
+        if now < opens:
+            return _clamp(opens - now)
+
+        if now <= closes:
+            return POLL_DENSE_INTERVAL
+
+        # Later than usual, keep checking without hammering the server
+        return POLL_LATE_INTERVAL
+
+    async def _async_load(self) -> None:
+        """Load the stored samples once, concurrent callers share the load."""
+
+        if self._load_task is None:
+            self._load_task = self.hass.async_create_task(self._async_load_areas())
+
+        await self._load_task
+
+    async def _async_load_areas(self) -> None:
+        self._areas.update(await self._store.async_load() or {})
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, Any]]:
+        return self._areas
+
+
+def _clamp(delay: timedelta) -> timedelta:
+    return min(max(delay, POLL_DENSE_INTERVAL), POLL_IDLE_INTERVAL)
+
+
+@callback
+def async_get_publish_schedule(hass: HomeAssistant) -> PublishSchedule:
+    """Return the publish schedule shared by every config entry."""
+
+    domain_data = hass.data.setdefault(DOMAIN, {})
+
+    if (schedule := domain_data.get(DATA_PUBLISH_SCHEDULE)) is None:
+        schedule = domain_data[DATA_PUBLISH_SCHEDULE] = PublishSchedule(hass)
+
+    return schedule
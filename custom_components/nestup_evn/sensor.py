@@ -1,5 +1,7 @@
 """Setup and manage HomeAssistant Entities."""
 
+import asyncio
+from functools import partial
 import logging
 from typing import Any
 import os
@@ -11,31 +13,53 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
 )
 
 from . import nestup_evn
+from .account import EVNAccount, async_get_account_registry
 from .const import (
+    ATTR_LAST_SUCCESS,
+    ATTR_STALE,
+    BACKFILL_INTERVAL,
     CONF_AREA,
+    CONF_BACKFILL_DAYS,
     CONF_CUSTOMER_ID,
     CONF_DEVICE_MANUFACTURER,
     CONF_DEVICE_MODEL,
     CONF_DEVICE_NAME,
     CONF_DEVICE_SW_VERSION,
-    CONF_ERR_INVALID_AUTH,
     CONF_MONTHLY_START,
     CONF_PASSWORD,
     CONF_SUCCESS,
     CONF_USERNAME,
-    DEFAULT_SCAN_INTERVAL,
+    DATA_AREA_ENTITIES,
+    DEFAULT_BACKFILL_DAYS,
     DOMAIN,
 )
-from .types import EVN_SENSORS, EVNSensorEntityDescription
+from .resilience import (
+    CircuitBreaker,
+    EVNRequestError,
+    TokenBucket,
+    async_get_circuit_breaker,
+    async_get_rate_limiter,
+)
+from .schedule import startup_delay
+from .statistics import async_backfill_statistics
+from .types import (
+    EVN_DIAGNOSTIC_SENSORS,
+    EVN_SENSORS,
+    EVNDiagnosticEntityDescription,
+    EVNSensorEntityDescription,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -47,10 +71,28 @@ async def async_setup_entry(
 
     entry_config = hass.data[DOMAIN][entry.entry_id]
 
-    evn_api = nestup_evn.EVNAPI(hass, True)
-    evn_device = EVNDevice(entry_config, evn_api)
+    account_registry = async_get_account_registry(hass)
+    account = account_registry.async_acquire(
+        entry_config[CONF_AREA],
+        entry_config[CONF_USERNAME],
+        entry_config[CONF_PASSWORD],
+        entry_config[CONF_CUSTOMER_ID],
+        entry_config.get(CONF_MONTHLY_START),
+    )
+    release_account = partial(
+        account_registry.async_release, account, entry_config[CONF_CUSTOMER_ID]
+    )
+
+    evn_device = EVNDevice(entry_config, account)
+
+    try:
+        await evn_device.async_setup()
+    except Exception:
+        release_account()
+        raise
 
-    await evn_device.async_create_coordinator(hass)
+    entry.async_on_unload(release_account)
+    entry.async_on_unload(evn_device.async_start())
 
     entities = []
     entities.extend(
@@ -59,22 +101,85 @@ async def async_setup_entry(
 
     async_add_entities(entities)
 
+    # Diagnostic sensors used to be added for every customer ID
+    entity_registry = er.async_get(hass)
+
+    for description in EVN_DIAGNOSTIC_SENSORS:
+        if entity_id := entity_registry.async_get_entity_id(
+            ENTITY_DOMAIN,
+            DOMAIN,
+            f"{entry_config[CONF_CUSTOMER_ID]}_{description.key}".lower(),
+        ):
+            entity_registry.async_remove(entity_id)
+
+    entry.async_on_unload(
+        _async_add_area_entities(
+            hass, entry.entry_id, entry_config[CONF_AREA]["name"], async_add_entities
+        )
+    )
+
+
+@callback
+def _async_add_area_entities(
+    hass: HomeAssistant,
+    entry_id: str,
+    area_name: str,
+    async_add_entities: AddEntitiesCallback,
+) -> CALLBACK_TYPE:
+    """Add the diagnostic sensors of an EVN area, unless another entry did.
+
+    Return a function handing the sensors over to another entry of the
+    area once this one is unloaded.
+    """
+
+    area_entities = (
+        hass.data[DOMAIN]
+        .setdefault(DATA_AREA_ENTITIES, {})
+        .setdefault(area_name, {"owner": None, "adders": {}})
+    )
+    area_entities["adders"][entry_id] = async_add_entities
+
+    def add_sensors(owner: str, add_entities: AddEntitiesCallback) -> None:
+        area_entities["owner"] = owner
+        area = EVNArea(hass, area_name)
+        add_entities(
+            [
+                EVNDiagnosticSensor(area, description)
+                for description in EVN_DIAGNOSTIC_SENSORS
+            ]
+        )
+
+    # An entry reloaded without unloading first still owns the sensors
+    if area_entities["owner"] in (None, entry_id):
+        add_sensors(entry_id, async_add_entities)
+
+    @callback
+    def release() -> None:
+        area_entities["adders"].pop(entry_id, None)
+
+        if area_entities["owner"] != entry_id:
+            return
+
+        area_entities["owner"] = None
+
+        # The sensors went away with the entry's platform
+        for owner, add_entities in area_entities["adders"].items():
+            add_sensors(owner, add_entities)
+            break
+
+    return release
+
 
 class EVNDevice:
     """EVN Device Instance"""
 
-    def __init__(self, dataset, api: nestup_evn.EVNAPI) -> None:
+    def __init__(self, dataset, account: EVNAccount) -> None:
         """Construct Device wrapper."""
         self._name = f"{CONF_DEVICE_NAME}: {dataset[CONF_CUSTOMER_ID]}"
-        self._coordinator: DataUpdateCoordinator = None
-        self.hass = api.hass
-        self._username = dataset.get(CONF_USERNAME)
-        self._password = dataset.get(CONF_PASSWORD)
+        self.hass = account.hass
         self._area_name = dataset.get(CONF_AREA)
         self._customer_id = dataset.get(CONF_CUSTOMER_ID)
-        self._monthly_start = dataset.get(CONF_MONTHLY_START)
-        self._api = api
-        self._data = {}
+        self._account = account
         self._branches_data = None  # Will store the branch data
 
     async def async_load_branches(self):
@@ -87,68 +192,80 @@ class EVNDevice:
         except Exception as ex:
             _LOGGER.error("Error loading branches data: %s", str(ex))
 
-    async def update(self) -> dict[str, Any]:
-        """Update device data from EVN Endpoints."""
+    async def async_setup(self) -> None:
+        """Prepare the device from its stored data, fresh data comes once started."""
+        await self.async_load_branches()
+        await self._account.async_restore_customer(self._customer_id)
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Fetch the first data in the background, return a function cancelling it.
+
+        Entries wait a delay fixed by their customer ID, so they neither hold
+        up start-up nor reach EVN all at the same time. With backfill on, past
+        readings are then imported into statistics, and again every day.
+        """
 
-        self._data = await self._api.request_update(
-            self._area_name, self._username, self._password, self._customer_id, self._monthly_start
+        task = self.hass.async_create_background_task(
+            self._async_first_refresh(), f"{DOMAIN}-{self._customer_id}-first-refresh"
         )
 
-        status = self._data.get("status")
+        if not self._backfill_days:
+            return task.cancel
 
-        if status != CONF_SUCCESS:
+        cancel_backfill = async_track_time_interval(
+            self.hass, self._async_backfill, BACKFILL_INTERVAL
+        )
 
-            if status == CONF_ERR_INVALID_AUTH:
-                _LOGGER.info(
-                    "[EVN ID %s] Expired session, try reauthenticating.",
-                    self._customer_id,
-                )
+        @callback
+        def cancel() -> None:
+            task.cancel()
+            cancel_backfill()
 
-                login_state = await self._api.login(
-                    self._area_name, self._username, self._password
-                )
+        return cancel
 
-                if login_state == CONF_SUCCESS:
-                    self._data = await self._api.request_update(
-                        self._area_name, self._customer_id, self._monthly_start
-                    )
-                    status = self._data.get("status")
+    async def _async_first_refresh(self) -> None:
+        """Fetch the first data of this device, later refreshed with its account."""
 
-        if status == CONF_SUCCESS:
-            _LOGGER.info(
-                "[EVN ID %s] Successfully fetched new data from EVN Server.",
-                self._customer_id,
-            )
+        await asyncio.sleep(startup_delay(self._customer_id))
 
-        else:
-            _LOGGER.warn(
-                "[EVN ID %s] Could not fetch new data - %s",
+        try:
+            await self._account.async_refresh_customer(self._customer_id)
+        except EVNRequestError as ex:
+            _LOGGER.warning(
+                "[EVN ID %s] Could not fetch first data, retrying later - %s",
                 self._customer_id,
-                self._data.get("data"),
+                ex,
             )
 
-        return self._data
+        if self._backfill_days:
+            await self._async_backfill()
 
-    async def _async_update(self):
-        """Fetch the latest data from EVN."""
-        await self.update()
+    @property
+    def _backfill_days(self) -> int:
+        """Return the days of history to import, none without daily series."""
 
-    async def async_create_coordinator(self, hass: HomeAssistant) -> None:
-        """Create the coordinator for this specific device."""
-        if self._coordinator:
-            return
+        if "recorder" not in self.hass.config.components:
+            return 0
 
-        await self.async_load_branches()
+        if not nestup_evn.supports_series(self._account.area_name):
+            return 0
 
-        coordinator = DataUpdateCoordinator(
-            hass,
-            _LOGGER,
-            name=f"{DOMAIN}-{self._customer_id}",
-            update_method=self._async_update,
-            update_interval=DEFAULT_SCAN_INTERVAL,
-        )
-        await coordinator.async_config_entry_first_refresh()
-        self._coordinator = coordinator
+        return self.hass.data[DOMAIN].get(CONF_BACKFILL_DAYS, DEFAULT_BACKFILL_DAYS)
+
+    async def _async_backfill(self, _now=None) -> None:
+        """Import the readings of this device missing from statistics."""
+
+        try:
+            await async_backfill_statistics(
+                self.hass, self._account, self._customer_id, self._backfill_days
+            )
+        except EVNRequestError as ex:
+            _LOGGER.warning(
+                "[EVN ID %s] Could not import past readings, retrying later - %s",
+                self._customer_id,
+                ex,
+            )
 
     @property
     def info(self) -> DeviceInfo:
@@ -170,10 +287,13 @@ class EVNDevice:
             model=CONF_DEVICE_MODEL,
         )
 
-    @property
-    def coordinator(self) -> DataUpdateCoordinator or None:
-        """Return coordinator associated."""
-        return self._coordinator
+    def coordinator(self, source: str) -> DataUpdateCoordinator:
+        """Return the coordinator of the device's account feeding a source."""
+        return self._account.coordinators[source]
+
+    def data(self, source: str) -> dict[str, Any]:
+        """Return the latest data of this device for a source."""
+        return self.coordinator(source).data.get(self._customer_id, {})
 
     @property
     def branch_info(self):
@@ -183,6 +303,38 @@ class EVNDevice:
         return nestup_evn.get_evn_info_sync(self._customer_id, self._branches_data)
 
 
+class EVNArea:
+    """EVN Area Instance, holding the state shared by all entries of the area"""
+
+    def __init__(self, hass: HomeAssistant, area_name: str) -> None:
+        """Construct Area wrapper."""
+        self._name = f"{CONF_DEVICE_NAME}: {area_name}"
+        self.hass = hass
+        self.area_name = area_name
+
+    @property
+    def info(self) -> DeviceInfo:
+        """Return device description for device registry."""
+        return DeviceInfo(
+            name=self._name,
+            identifiers={(DOMAIN, self.area_name)},
+            manufacturer=CONF_DEVICE_MANUFACTURER,
+            sw_version=CONF_DEVICE_SW_VERSION,
+            model=CONF_DEVICE_MODEL,
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker:
+        """Return the circuit breaker of the EVN area."""
+        return async_get_circuit_breaker(self.hass, self.area_name)
+
+    @property
+    def rate_limiter(self) -> TokenBucket:
+        """Return the rate limiter of the EVN area."""
+        return async_get_rate_limiter(self.hass, self.area_name)
+
+
 class EVNSensor(CoordinatorEntity, SensorEntity):
     """EVN Sensor Instance."""
 
@@ -190,7 +342,7 @@ class EVNSensor(CoordinatorEntity, SensorEntity):
         self, device: EVNDevice, description: EVNSensorEntityDescription, hass
     ):
         """Construct EVN sensor wrapper."""
-        super().__init__(device.coordinator)
+        super().__init__(device.coordinator(description.source))
 
         self._device = device
         self._attr_name = f"{device._name} {description.name}"
@@ -207,10 +359,18 @@ class EVNSensor(CoordinatorEntity, SensorEntity):
         """Return a unique ID."""
         return self._unique_id
 
+    @property
+    def _data(self) -> dict[str, Any]:
+        """Return the latest data of the source feeding the sensor."""
+        return self._device.data(self.entity_description.source)
+
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        data = self.entity_description.value_fn(self._device._data)
+        if self._data.get("status") != CONF_SUCCESS:
+            return None
+
+        data = self.entity_description.value_fn(self._data)
 
         if self.entity_description.dynamic_name:
             self._attr_name = f"{self._default_name} {data.get('info')}"
@@ -244,15 +404,67 @@ class EVNSensor(CoordinatorEntity, SensorEntity):
     def available(self) -> bool:
         """Return the availability of the sensor."""
         return (
-            self._device._data["status"] == CONF_SUCCESS
+            self._data.get("status") == CONF_SUCCESS
             and self.native_value is not None
         )
 
+    @property
+    def extra_state_attributes(self):
+        """Return whether the sensor shows data kept from an earlier refresh."""
+        if ATTR_LAST_SUCCESS not in self._data:
+            return None
+
+        return {
+            ATTR_STALE: self._data.get(ATTR_STALE, False),
+            ATTR_LAST_SUCCESS: self._data[ATTR_LAST_SUCCESS],
+        }
+
     @property
     def last_reset(self):
-        if self.entity_description.state_class == SensorStateClass.TOTAL:
-            data = self.entity_description.value_fn(self._device._data)
+        if (
+            self.entity_description.state_class == SensorStateClass.TOTAL
+            and self._data.get("status") == CONF_SUCCESS
+        ):
+            data = self.entity_description.value_fn(self._data)
 
             return data.get("info")
 
         return None
+
+
+class EVNDiagnosticSensor(SensorEntity):
+    """EVN Diagnostic Sensor Instance, reporting area-wide state."""
+
+    _attr_should_poll = False
+
+    def __init__(self, area: EVNArea, description: EVNDiagnosticEntityDescription):
+        """Construct EVN diagnostic sensor wrapper."""
+        self._area = area
+        self._source = description.source_fn(area)
+        self._attr_name = f"{area._name} {description.name}"
+        self._attr_unique_id = str(f"{area.area_name}_{description.key}").lower()
+
+        self.entity_id = f"{ENTITY_DOMAIN}.{area.area_name}_{description.key}".lower()
+        self.entity_description = description
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the area-wide state once added."""
+        self.async_on_remove(self._source.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def native_value(self):
+        """Return the state of the sensor."""
+        return self.entity_description.value_fn(self._source)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the details of the area-wide state."""
+        if self.entity_description.attributes_fn is None:
+            return None
+
+        return self.entity_description.attributes_fn(self._source)
+
+    @property
+    def device_info(self):
+        """Return a device description for device registry."""
+        return self._area.info
@@ -0,0 +1,302 @@
+"""Services of the EVN integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from contextlib import aclosing
+import csv
+from datetime import date, timedelta
+import logging
+import os
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+
+from .account import EVNAccount, async_get_account_registry
+from .const import (
+    DOMAIN,
+    EXPORT_COLUMNS,
+    EXPORT_CONCURRENCY,
+    EXPORT_DEFAULT_PERIOD,
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_PARQUET,
+    SERVICE_EXPORT_HISTORY,
+)
+from .history import (
+    async_fill_history,
+    async_get_reading_history,
+    billing_periods,
+    period_start,
+)
+from .nestup_evn import supports_series
+from .schedule import evn_now
+
+_LOGGER = logging.getLogger(__name__)
+
+EXPORT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required("path"): cv.string,
+        vol.Optional("customer_ids"): vol.All(
+            cv.ensure_list, [vol.All(cv.string, vol.Upper)]
+        ),
+        vol.Optional("start_date"): cv.date,
+        vol.Optional("end_date"): cv.date,
+        vol.Optional("format", default=EXPORT_FORMAT_CSV): vol.In(
+            (EXPORT_FORMAT_CSV, EXPORT_FORMAT_PARQUET)
+        ),
+    }
+)
+
+# (customer ID, first day, last day) of the readings read at once
+Window = tuple[str, date, date]
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def async_export_history(call: ServiceCall) -> ServiceResponse:
+        """Write the daily readings of customer IDs over a date range to a file."""
+
+        path = hass.config.path(call.data["path"])
+
+        if not hass.config.is_allowed_path(path):
+            raise ServiceValidationError(
+                f"Cannot write to {path}, not an allowed path"
+            )
+
+        customers = async_get_account_registry(hass).customers()
+
+        if unknown := set(call.data.get("customer_ids", ())) - set(customers):
+            raise ServiceValidationError(
+                f"Unknown customer IDs: {', '.join(sorted(unknown))}"
+            )
+
+        if unsupported := {
+            customer_id
+            for customer_id in call.data.get("customer_ids", ())
+            if not supports_series(customers[customer_id].area_name)
+        }:
+            raise ServiceValidationError(
+                f"No daily readings for customer IDs: {', '.join(sorted(unsupported))}"
+            )
+
+        end_date = call.data.get("end_date", evn_now().date() - timedelta(days=1))
+        start_date = call.data.get("start_date", end_date - EXPORT_DEFAULT_PERIOD)
+
+        if start_date > end_date:
+            raise ServiceValidationError("start_date must not be after end_date")
+
+        # By default, every customer ID whose area serves daily readings
+        accounts = {
+            customer_id: customers[customer_id]
+            for customer_id in call.data.get(
+                "customer_ids",
+                [
+                    customer_id
+                    for customer_id in sorted(customers)
+                    if supports_series(customers[customer_id].area_name)
+                ],
+            )
+        }
+
+        rows = await _async_export(
+            hass,
+            path,
+            call.data["format"],
+            accounts,
+            _windows(accounts, start_date, end_date),
+        )
+
+        _LOGGER.info("Exported %s daily readings to %s", rows, path)
+
+        return {"path": path, "rows": rows}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_HISTORY,
+        async_export_history,
+        schema=EXPORT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+def _windows(
+    accounts: dict[str, EVNAccount], start_date: date, end_date: date
+) -> Iterator[Window]:
+    """Split the export into the billing periods of each customer ID.
+
+    The first period starts on its first day so that its readings are
+    priced on the whole period, only the days asked for are written.
+    """
+
+    for customer_id, account in accounts.items():
+        monthly_start = account.customers.get(customer_id) or 1
+
+        for start, end in billing_periods(
+            period_start(start_date, monthly_start), end_date, monthly_start
+        ):
+            yield customer_id, max(start, start_date), end
+
+
+async def _async_export(
+    hass: HomeAssistant,
+    path: str,
+    export_format: str,
+    accounts: dict[str, EVNAccount],
+    windows: Iterator[Window],
+) -> int:
+    """Write the rows of every window to a file, return the number of rows."""
+
+    temp_path = f"{path}.tmp"
+    writer = await hass.async_add_executor_job(WRITERS[export_format], temp_path)
+    rows = 0
+
+    try:
+        async with aclosing(_async_read_ahead(hass, accounts, windows)) as chunks:
+            async for chunk in chunks:
+                await hass.async_add_executor_job(writer.write, chunk)
+                rows += len(chunk)
+
+    except BaseException:
+        await hass.async_add_executor_job(writer.close)
+        await hass.async_add_executor_job(os.remove, temp_path)
+        raise
+
+    await hass.async_add_executor_job(writer.close)
+    await hass.async_add_executor_job(os.replace, temp_path, path)
+
+    return rows
+
+
+async def _async_read_ahead(
+    hass: HomeAssistant, accounts: dict[str, EVNAccount], windows: Iterator[Window]
+) -> AsyncIterator[list[tuple[Any, ...]]]:
+    """Yield the rows of each window in order, fetching a few windows ahead.
+
+    At most EXPORT_CONCURRENCY windows are read at once, the rows of a
+    window are only built once the writer asks for them.
+    """
+
+    async def fill(customer_id: str, start: date, end: date) -> None:
+        account = accounts[customer_id]
+        # Fetched from the start of the period, for its days to be priced
+        first_day = period_start(start, account.customers.get(customer_id) or 1)
+
+        if not await async_fill_history(hass, account, customer_id, first_day, end):
+            raise HomeAssistantError(
+                f"Could not fetch the readings of {customer_id} from {start} to {end}"
+            )
+
+    pending: deque[tuple[Window, asyncio.Task]] = deque()
+
+    try:
+        for window in windows:
+            pending.append((window, hass.async_create_task(fill(*window))))
+
+            if len(pending) < EXPORT_CONCURRENCY:
+                continue
+
+            yield await _async_rows(hass, *pending.popleft())
+
+        while pending:
+            yield await _async_rows(hass, *pending.popleft())
+
+    finally:
+        for _, task in pending:
+            if not task.cancel() and not task.cancelled():
+                # Already done, its failure does not matter anymore
+                task.exception()
+
+
+async def _async_rows(
+    hass: HomeAssistant, window: Window, task: asyncio.Task
+) -> list[tuple[Any, ...]]:
+    """Return the rows of a window once its readings are in."""
+
+    await task
+
+    customer_id, start, end = window
+    history = async_get_reading_history(hass, customer_id)
+
+    return [
+        (customer_id, day, index, consumption, cost)
+        for day, index, consumption, cost in history.records(start, end)
+    ]
+
+
+class CsvWriter:
+    """Write rows to a CSV file, with a header"""
+
+    def __init__(self, path: str) -> None:
+        """Open the file and write its header, run in the executor."""
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(EXPORT_COLUMNS)
+
+    def write(self, rows: list[tuple[Any, ...]]) -> None:
+        """Append rows, run in the executor."""
+        self._writer.writerows(rows)
+
+    def close(self) -> None:
+        """Close the file, run in the executor."""
+        self._file.close()
+
+
+class ParquetWriter:
+    """Write rows to a Parquet file, one row group per chunk"""
+
+    def __init__(self, path: str) -> None:
+        """Open the file, run in the executor."""
+
+        # Only needed for Parquet exports, not a requirement of the integration
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as ex:
+            raise HomeAssistantError(
+                "Exporting to Parquet needs the pyarrow package"
+            ) from ex
+
+        self._pyarrow = pyarrow
+        self._schema = pyarrow.schema(
+            [
+                ("customer_id", pyarrow.string()),
+                ("day", pyarrow.date32()),
+                ("index", pyarrow.float64()),
+                ("consumption", pyarrow.float64()),
+                ("cost", pyarrow.float64()),
+            ]
+        )
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+
+    def write(self, rows: list[tuple[Any, ...]]) -> None:
+        """Append rows, run in the executor."""
+
+        if not rows:
+            return
+
+        self._writer.write_table(
+            self._pyarrow.Table.from_arrays(
+                [list(column) for column in zip(*rows)], schema=self._schema
+            )
+        )
+
+    def close(self) -> None:
+        """Close the file, run in the executor."""
+        self._writer.close()
+
+
+WRITERS = {EXPORT_FORMAT_CSV: CsvWriter, EXPORT_FORMAT_PARQUET: ParquetWriter}
@@ -0,0 +1,143 @@
+"""Shared HTTP sessions for EVN Endpoints."""
+
+from __future__ import annotations
+
+from functools import partial
+import logging
+import ssl
+
+import aiohttp
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    DATA_SESSION_POOL,
+    DOMAIN,
+    SESSION_KEEPALIVE_TIMEOUT,
+    SESSION_LIMIT_PER_HOST,
+    SESSION_LINGER_TIME,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Built once per Home Assistant instance, keyed by whether
+# the weaker cipher set of some EVN Endpoints is allowed
+_SSL_CONTEXTS: dict[bool, ssl.SSLContext] = {}
+
+
+def create_ssl_context():
+    """Create SSL context with cipher settings"""
+    context = ssl.create_default_context()
+    context.set_ciphers("ALL:@SECLEVEL=1")
+    return context
+
+
+async def async_get_ssl_context(
+    hass: HomeAssistant, legacy: bool = False
+) -> ssl.SSLContext:
+    """Return the cached SSL context, building it on first use"""
+
+    if (context := _SSL_CONTEXTS.get(legacy)) is None:
+        # Loading the CA bundle reads from disk, keep it off the event loop
+        context = await hass.async_add_executor_job(
+            create_ssl_context if legacy else ssl.create_default_context
+        )
+        context = _SSL_CONTEXTS.setdefault(legacy, context)
+
+    return context
+
+
+class EVNSessionPool:
+    """Reference-counted aiohttp sessions, one per EVN area"""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Construct the session pool."""
+        self.hass = hass
+        self._sessions: dict[str, aiohttp.ClientSession] = {}
+        self._refs: dict[str, int] = {}
+        self._pending_close: dict[str, CALLBACK_TYPE] = {}
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, self._async_close_all)
+
+    @callback
+    def async_acquire(self, area_name: str) -> aiohttp.ClientSession:
+        """Return the session of an EVN area and take a reference on it."""
+
+        if (cancel := self._pending_close.pop(area_name, None)) is not None:
+            cancel()
+
+        session = self._sessions.get(area_name)
+
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=SESSION_LIMIT_PER_HOST,
+                keepalive_timeout=SESSION_KEEPALIVE_TIMEOUT,
+                enable_cleanup_closed=True,
+            )
+            # Accounts of an area share the session, not their cookies: every
+            # request already carries its own credentials
+            session = aiohttp.ClientSession(
+                connector=connector, cookie_jar=aiohttp.DummyCookieJar()
+            )
+            self._sessions[area_name] = session
+            _LOGGER.debug("Created shared HTTP session for %s", area_name)
+
+        self._refs[area_name] = self._refs.get(area_name, 0) + 1
+
+        return session
+
+    @callback
+    def async_release(self, area_name: str) -> None:
+        """Drop a reference, closing the session shortly after the last one."""
+
+        refs = self._refs.get(area_name, 0) - 1
+
+        if refs > 0:
+            self._refs[area_name] = refs
+            return
+
+        self._refs.pop(area_name, None)
+
+        # Keep the session around for a moment, reloading an entry
+        # would otherwise tear down and rebuild every connection
+        if area_name in self._sessions and area_name not in self._pending_close:
+            self._pending_close[area_name] = async_call_later(
+                self.hass, SESSION_LINGER_TIME, partial(self._async_close, area_name)
+            )
+
+    @callback
+    def _async_close(self, area_name: str, _now=None) -> None:
+        """Close the session of an EVN area."""
+
+        self._pending_close.pop(area_name, None)
+
+        if (session := self._sessions.pop(area_name, None)) is not None:
+            _LOGGER.debug("Closing shared HTTP session for %s", area_name)
+            self.hass.async_create_task(session.close())
+
+    async def _async_close_all(self, _event: Event) -> None:
+        """Close every session when Home Assistant stops."""
+
+        for cancel in self._pending_close.values():
+            cancel()
+
+        self._pending_close.clear()
+        self._refs.clear()
+
+        while self._sessions:
+            _, session = self._sessions.popitem()
+            await session.close()
+
+
+@callback
+def async_get_session_pool(hass: HomeAssistant) -> EVNSessionPool:
+    """Return the session pool shared by every config entry."""
+
+    domain_data = hass.data.setdefault(DOMAIN, {})
+
+    if (pool := domain_data.get(DATA_SESSION_POOL)) is None:
+        pool = domain_data[DATA_SESSION_POOL] = EVNSessionPool(hass)
+
+    return pool
@@ -0,0 +1,161 @@
+"""Import past EVN readings into Home Assistant long-term statistics."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_DEVICE_NAME,
+    DOMAIN,
+    EVN_TIME_ZONE,
+    STATISTIC_COST,
+    STATISTIC_ENERGY,
+    UNIT_VND,
+)
+from .history import (
+    ReadingHistory,
+    async_fill_history,
+    async_get_reading_history,
+    billing_periods,
+    period_start,
+)
+from .schedule import evn_now
+
+if TYPE_CHECKING:
+    from .account import EVNAccount
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def statistic_id(customer_id: str, kind: str) -> str:
+    """Return the ID of the external statistic of a customer ID."""
+    return f"{DOMAIN}:{customer_id.lower()}_{kind}"
+
+
+async def async_backfill_statistics(
+    hass: HomeAssistant, account: EVNAccount, customer_id: str, days: int
+) -> None:
+    """Import the daily readings of a customer ID missing from the statistics.
+
+    The import resumes after the last day already imported, going back days
+    the first time, and moves forward one billing period at a time. Periods
+    missing from the reading history are fetched first, one request each.
+    """
+
+    monthly_start = account.customers.get(customer_id) or 1
+    yesterday = evn_now().date() - timedelta(days=1)
+
+    # Per statistic, the last day imported and the sum reached on it
+    progress = {
+        kind: await _async_last_statistic(hass, statistic_id(customer_id, kind))
+        or (yesterday - timedelta(days=days), 0.0)
+        for kind in (STATISTIC_ENERGY, STATISTIC_COST)
+    }
+
+    first_day = min(last_day for last_day, _ in progress.values()) + timedelta(days=1)
+
+    if first_day > yesterday:
+        return
+
+    history = async_get_reading_history(hass, customer_id)
+    await history.async_load()
+
+    for start, end in billing_periods(
+        period_start(first_day, monthly_start), yesterday, monthly_start
+    ):
+        if not await async_fill_history(hass, account, customer_id, start, end):
+            return
+
+        statistics = _statistics(history, start, end, progress)
+
+        for kind, rows in statistics.items():
+            if rows:
+                async_add_external_statistics(
+                    hass, _metadata(customer_id, kind), rows
+                )
+
+        _LOGGER.debug(
+            "[EVN ID %s] Imported %s days of statistics from %s to %s",
+            customer_id,
+            len(statistics[STATISTIC_ENERGY]),
+            start,
+            end,
+        )
+
+
+def _statistics(
+    history: ReadingHistory,
+    start: date,
+    end: date,
+    progress: dict[str, tuple[date, float]],
+) -> dict[str, list[StatisticData]]:
+    """Return the rows of a billing period not imported yet, updating progress."""
+
+    time_zone = dt_util.get_time_zone(EVN_TIME_ZONE)
+    statistics: dict[str, list[StatisticData]] = {kind: [] for kind in progress}
+
+    for day, index, consumption, cost in history.records(start, end):
+        # Readings are daily, each one goes in the hour its day starts
+        hour = datetime.combine(day, time(), time_zone)
+
+        for kind, change, state in (
+            (STATISTIC_ENERGY, consumption, index),
+            (STATISTIC_COST, cost, None),
+        ):
+            last_day, total = progress[kind]
+
+            if day <= last_day:
+                continue
+
+            total += change
+            progress[kind] = (day, total)
+            statistics[kind].append(StatisticData(start=hour, state=state, sum=total))
+
+    return statistics
+
+
+def _metadata(customer_id: str, kind: str) -> StatisticMetaData:
+    return StatisticMetaData(
+        has_mean=False,
+        has_sum=True,
+        name=f"{CONF_DEVICE_NAME}: {customer_id} {kind}",
+        source=DOMAIN,
+        statistic_id=statistic_id(customer_id, kind),
+        unit_of_measurement=(
+            UnitOfEnergy.KILO_WATT_HOUR if kind == STATISTIC_ENERGY else UNIT_VND
+        ),
+    )
+
+
+async def _async_last_statistic(
+    hass: HomeAssistant, statistic: str
+) -> tuple[date, float] | None:
+    """Return the day and sum of the last row of a statistic, if any."""
+
+    last: dict[str, list[dict[str, Any]]] = await get_instance(
+        hass
+    ).async_add_executor_job(get_last_statistics, hass, 1, statistic, True, {"sum"})
+
+    if not (rows := last.get(statistic)):
+        return None
+
+    start = rows[0]["start"]
+
+    if not isinstance(start, datetime):
+        start = dt_util.utc_from_timestamp(start)
+
+    day = start.astimezone(dt_util.get_time_zone(EVN_TIME_ZONE)).date()
+
+    return day, rows[0]["sum"] or 0.0
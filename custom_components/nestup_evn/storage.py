@@ -0,0 +1,228 @@
+"""Persistent storage for the EVN integration."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime, timezone
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    AUTH_KEYS,
+    AUTH_SAVE_DELAY,
+    DATA_AUTH_STORE,
+    DATA_RESULT_STORE,
+    DOMAIN,
+    RESULTS_SAVE_DELAY,
+    STORAGE_KEY_AUTH,
+    STORAGE_KEY_RESULTS,
+    STORAGE_VERSION,
+)
+
+
+def credentials_valid(credentials: dict[str, Any]) -> bool:
+    """Return whether a stored EVN session can still be used."""
+
+    if not (credentials.get("access_token") or credentials.get("evn_session")):
+        return False
+
+    if time.time() >= credentials.get("token_expiry", float("inf")):
+        return False
+
+    expires = credentials.get("expires")
+
+    if isinstance(expires, datetime) and datetime.now(tz=timezone.utc) >= expires:
+        return False
+
+    return True
+
+
+class EVNAuthStore:
+    """EVN sessions of every account, kept across restarts"""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Construct the store, loaded on first use."""
+        self.hass = hass
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY_AUTH, private=True)
+        self._accounts: dict[str, dict[str, Any]] = {}
+        self._load_task: asyncio.Task | None = None
+
+    async def async_get(self, area_name: str, username: str) -> dict[str, Any]:
+        """Return the stored session of an account."""
+
+        await self._async_load()
+
+        credentials = dict(self._accounts.get(_account_key(area_name, username), {}))
+
+        if isinstance(expires := credentials.get("expires"), str):
+            credentials["expires"] = dt_util.parse_datetime(expires)
+
+        return credentials
+
+    async def async_set(
+        self, area_name: str, username: str, credentials: dict[str, Any]
+    ) -> None:
+        """Remember the session of an account, saving it shortly after."""
+
+        await self._async_load()
+
+        stored = {key: credentials[key] for key in AUTH_KEYS if key in credentials}
+
+        if isinstance(expires := stored.get("expires"), datetime):
+            stored["expires"] = expires.isoformat()
+
+        self._accounts[_account_key(area_name, username)] = stored
+        self._store.async_delay_save(self._data_to_save, AUTH_SAVE_DELAY)
+
+    async def async_remove(self, area_name: str, username: str) -> None:
+        """Forget the session of an account."""
+
+        await self._async_load()
+
+        if self._accounts.pop(_account_key(area_name, username), None) is not None:
+            self._store.async_delay_save(self._data_to_save, AUTH_SAVE_DELAY)
+
+    async def _async_load(self) -> None:
+        """Load the stored sessions once, concurrent callers share the load."""
+
+        if self._load_task is None:
+            self._load_task = self.hass.async_create_task(self._async_load_accounts())
+
+        await self._load_task
+
+    async def _async_load_accounts(self) -> None:
+        self._accounts.update(await self._store.async_load() or {})
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, Any]]:
+        return self._accounts
+
+
+def _account_key(area_name: str, username: str) -> str:
+    return f"{area_name}:{username}"
+
+
+@callback
+def async_get_auth_store(hass: HomeAssistant) -> EVNAuthStore:
+    """Return the session store shared by every config entry."""
+
+    domain_data = hass.data.setdefault(DOMAIN, {})
+
+    if (store := domain_data.get(DATA_AUTH_STORE)) is None:
+        store = domain_data[DATA_AUTH_STORE] = EVNAuthStore(hass)
+
+    return store
+
+
+class EVNResultStore:
+    """Last good formatted results of every customer ID, kept across restarts"""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Construct the store, loaded on first use."""
+        self.hass = hass
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY_RESULTS)
+        # Encoded results by customer ID, then by source
+        self._customers: dict[str, dict[str, Any]] = {}
+        self._load_task: asyncio.Task | None = None
+
+    async def async_get(self, customer_id: str) -> dict[str, dict[str, Any]]:
+        """Return the stored results of a customer ID, by source."""
+
+        await self._async_load()
+
+        return {
+            source: decode_result(result)
+            for source, result in self._customers.get(customer_id, {}).items()
+        }
+
+    @callback
+    def async_set(self, customer_id: str, source: str, result: dict[str, Any]) -> None:
+        """Remember a result of a customer ID, saving it shortly after.
+
+        Results set before the store is loaded are kept over the loaded ones.
+        """
+
+        if self._load_task is None:
+            self._load_task = self.hass.async_create_task(self._async_load_customers())
+
+        self._customers.setdefault(customer_id, {})[source] = encode_result(result)
+        self._store.async_delay_save(self._data_to_save, RESULTS_SAVE_DELAY)
+
+    async def async_remove(self, customer_id: str) -> None:
+        """Forget the results of a customer ID."""
+
+        await self._async_load()
+
+        if self._customers.pop(customer_id, None) is not None:
+            self._store.async_delay_save(self._data_to_save, RESULTS_SAVE_DELAY)
+
+    async def _async_load(self) -> None:
+        """Load the stored results once, concurrent callers share the load."""
+
+        if self._load_task is None:
+            self._load_task = self.hass.async_create_task(self._async_load_customers())
+
+        await self._load_task
+
+    async def _async_load_customers(self) -> None:
+        for customer_id, results in (await self._store.async_load() or {}).items():
+            self._customers[customer_id] = {
+                **results,
+                **self._customers.get(customer_id, {}),
+            }
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, Any]]:
+        return self._customers
+
+
+def encode_result(value: Any) -> Any:
+    """Encode a formatted result to JSON, tagging its dates and times."""
+
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+
+    if isinstance(value, dict):
+        return {key: encode_result(item) for key, item in value.items()}
+
+    if isinstance(value, (list, tuple)):
+        return [encode_result(item) for item in value]
+
+    return value
+
+
+def decode_result(value: Any) -> Any:
+    """Decode a formatted result encoded by encode_result."""
+
+    if isinstance(value, dict):
+        if "__datetime__" in value:
+            return dt_util.parse_datetime(value["__datetime__"])
+
+        if "__date__" in value:
+            return date.fromisoformat(value["__date__"])
+
+        return {key: decode_result(item) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [decode_result(item) for item in value]
+
+    return value
+
+
+@callback
+def async_get_result_store(hass: HomeAssistant) -> EVNResultStore:
+    """Return the result store shared by every config entry."""
+
+    domain_data = hass.data.setdefault(DOMAIN, {})
+
+    if (store := domain_data.get(DATA_RESULT_STORE)) is None:
+        store = domain_data[DATA_RESULT_STORE] = EVNResultStore(hass)
+
+    return store
@@ -0,0 +1,214 @@
+"""Tiered retail tariffs of EVN, pricing a consumption in VND."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator, Mapping
+from datetime import date
+from functools import lru_cache
+
+from .const import TARIFF_CACHE_SIZE, VIETNAM_ECOST_TARIFFS, VIETNAM_ECOST_VAT_RATES
+
+# Only used to price many consumptions at once, not a requirement
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class Tariff:
+    """Price per kWh of each tier, with VAT
+
+    The cost of every tier below each threshold is computed once, so
+    pricing a consumption takes a bisect over the thresholds instead of
+    a walk through the tiers.
+    """
+
+    def __init__(
+        self, stages: Mapping[float, float], vat: float, effective: date = date.min
+    ) -> None:
+        """Construct the tariff from the price of each tier by its first kWh."""
+
+        self.thresholds = tuple(sorted(stages))
+        self.prices = tuple(stages[threshold] for threshold in self.thresholds)
+        self.vat = vat
+        self.effective = effective
+
+        # Cost before VAT of the consumption up to each threshold
+        cumulative = [0.0]
+
+        for index in range(1, len(self.thresholds)):
+            cumulative.append(
+                cumulative[-1]
+                + (self.thresholds[index] - self.thresholds[index - 1])
+                * self.prices[index - 1]
+            )
+
+        self.cumulative = tuple(cumulative)
+
+        if np is not None:
+            self._columns = (
+                np.array(self.thresholds, dtype=np.float64),
+                np.array(self.cumulative, dtype=np.float64),
+                np.array(self.prices, dtype=np.float64),
+            )
+
+    def __repr__(self) -> str:
+        return f"Tariff(effective={self.effective}, vat={self.vat})"
+
+    def amount(self, kwh: float) -> float:
+        """Return the cost of a consumption in VND, VAT included, unrounded."""
+        return _amount(self, kwh)
+
+    def cost(self, kwh: float) -> int:
+        """Return the cost of a consumption in VND, VAT included."""
+        return int(round(_amount(self, kwh)))
+
+    def amounts(self, kwh: Iterable[float]) -> array:
+        """Return the unrounded cost of each consumption in VND, VAT included.
+
+        Consumptions are priced together with NumPy when it is installed,
+        one by one otherwise.
+        """
+
+        if np is None:
+            return array("d", (_amount(self, value) for value in kwh))
+
+        thresholds, cumulative, prices = self._columns
+        values = np.fromiter(kwh, dtype=np.float64)
+        tiers = np.maximum(np.searchsorted(thresholds, values, side="right") - 1, 0)
+
+        total = cumulative[tiers] + (values - thresholds[tiers]) * prices[tiers]
+        total = np.where(values < thresholds[0], 0.0, total)
+
+        return array("d", ((total / 100) * (100 + self.vat)).tobytes())
+
+    def costs(self, kwh: Iterable[float]) -> array:
+        """Return the cost of each consumption in VND, VAT included."""
+        return _rounded(self.amounts(kwh))
+
+
+@lru_cache(maxsize=TARIFF_CACHE_SIZE)
+def _amount(tariff: Tariff, kwh: float) -> float:
+    """Price a consumption with a tariff, remembered per (tariff, kWh)."""
+
+    if kwh < tariff.thresholds[0]:
+        return 0.0
+
+    tier = bisect_right(tariff.thresholds, kwh) - 1
+    total = (
+        tariff.cumulative[tier]
+        + (kwh - tariff.thresholds[tier]) * tariff.prices[tier]
+    )
+
+    return (total / 100) * (100 + tariff.vat)
+
+
+def _rounded(amounts: array) -> array:
+    if np is None or not amounts:
+        return array("q", (int(round(amount)) for amount in amounts))
+
+    return array("q", np.rint(np.frombuffer(amounts)).astype(np.int64).tobytes())
+
+
+class TariffSchedule:
+    """Tariffs by the day they take effect, one version per change
+
+    A version starts whenever the prices or the VAT rate change. A billing
+    period spanning versions is priced pro rata by day, each version
+    pricing the whole consumption for its share of the days.
+    """
+
+    def __init__(
+        self,
+        tariffs: Mapping[date, Mapping[float, float]],
+        vat_rates: Mapping[date, float],
+    ) -> None:
+        """Construct the schedule from the prices and the VAT rates by day."""
+
+        tariff_days = sorted(tariffs)
+        vat_days = sorted(vat_rates)
+
+        self.versions: list[Tariff] = []
+
+        for effective in sorted(set(tariff_days) | set(vat_days)):
+            stages = tariff_days[max(bisect_right(tariff_days, effective) - 1, 0)]
+            vat = vat_days[max(bisect_right(vat_days, effective) - 1, 0)]
+
+            self.versions.append(
+                Tariff(tariffs[stages], vat_rates[vat], max(effective, stages))
+            )
+
+        self._starts = [version.effective.toordinal() for version in self.versions]
+
+    @property
+    def latest(self) -> Tariff:
+        """Return the tariff in effect since the last change."""
+        return self.versions[-1]
+
+    def tariff(self, day: date) -> Tariff:
+        """Return the tariff in effect on a day, the oldest one before any."""
+        return self.versions[max(bisect_right(self._starts, day.toordinal()) - 1, 0)]
+
+    def shares(self, start: date, end: date) -> Iterator[tuple[Tariff, float]]:
+        """Yield each tariff in effect between two days with its share of them."""
+
+        first, last = start.toordinal(), end.toordinal()
+
+        if first >= last:
+            yield self.tariff(end), 1.0
+            return
+
+        days = last - first + 1
+        index = max(bisect_right(self._starts, first) - 1, 0)
+
+        while first <= last:
+            stop = last + 1
+
+            if index + 1 < len(self._starts):
+                stop = min(self._starts[index + 1], stop)
+
+            yield self.versions[index], (stop - first) / days
+
+            first = stop
+            index += 1
+
+    def cost(self, kwh: float, start: date, end: date) -> int:
+        """Return the cost of the consumption of a billing period in VND."""
+        return int(
+            round(
+                sum(
+                    share * tariff.amount(kwh)
+                    for tariff, share in self.shares(start, end)
+                )
+            )
+        )
+
+    def costs(self, kwh: Iterable[float], start: date, end: date) -> array:
+        """Return the cost of each consumption over a billing period in VND."""
+
+        values = array("d", kwh)
+        shares = list(self.shares(start, end))
+
+        if len(shares) == 1 or not values:
+            return shares[0][0].costs(values)
+
+        columns = [(share, tariff.amounts(values)) for tariff, share in shares]
+
+        if np is not None:
+            total = sum(share * np.frombuffer(amounts) for share, amounts in columns)
+            return _rounded(array("d", total.tobytes()))
+
+        return _rounded(
+            array(
+                "d",
+                (
+                    sum(share * amounts[position] for share, amounts in columns)
+                    for position in range(len(values))
+                ),
+            )
+        )
+
+
+TARIFFS = TariffSchedule(VIETNAM_ECOST_TARIFFS, VIETNAM_ECOST_VAT_RATES)
@@ -1,5 +1,6 @@
 from array import ArrayType
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field
+from datetime import date
 from typing import Any, Callable
 
 from homeassistant.components.sensor import (
@@ -7,9 +8,12 @@ from homeassistant.components.sensor import (
     SensorEntityDescription,
     SensorStateClass,
 )
-from homeassistant.const import UnitOfEnergy
+from homeassistant.const import UnitOfEnergy, UnitOfTime
+from homeassistant.helpers.entity import EntityCategory
 
 from .const import (
+    ID_CIRCUIT_BREAKER,
+    ID_REQUEST_WAIT,
     ID_ECON_DAILY_NEW,
     ID_ECON_DAILY_OLD,
     ID_ECON_MONTHLY_NEW,
@@ -24,6 +28,8 @@ from .const import (
     ID_PAYMENT_NEEDED,
     ID_LOADSHEDDING,
     ID_TO_DATE,
+    SOURCE_BILLING,
+    SOURCE_CONSUMPTION,
 )
 
 
@@ -39,6 +45,33 @@ class Entity:
     state_class: SensorStateClass or None
 
 
+@dataclass
+class RetryPolicy:
+    """Describe how requests to an EVN area are retried."""
+
+    attempts: int = 3
+    base_delay: float = 1.0  # in seconds
+    max_delay: float = 20.0  # in seconds
+    budget: int = 6  # retries allowed per login or update
+    retry_statuses: tuple[int, ...] = (408, 429, 500, 502, 503, 504)
+
+
+@dataclass
+class BreakerPolicy:
+    """Describe when requests to an EVN area are short-circuited."""
+
+    failure_threshold: int = 5  # consecutive failures before opening
+    cooldown: float = 300.0  # in seconds
+
+
+@dataclass
+class RateLimitPolicy:
+    """Describe the outbound request rate allowed towards an EVN area."""
+
+    rate: float = 2.0  # requests per second
+    burst: int = 6
+
+
 @dataclass
 class Area:
     """Describe the supported areas."""
@@ -53,6 +86,30 @@ class Area:
     supported: bool = True
     date_needed: bool = True
     pattern: ArrayType | None = None
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+    breaker: BreakerPolicy = field(default_factory=BreakerPolicy)
+    rate_limit: RateLimitPolicy = field(default_factory=RateLimitPolicy)
+
+    def entry_data(self) -> dict[str, Any]:
+        """Return the area as kept in config entries, without its policies."""
+        return {
+            key: value
+            for key, value in asdict(self).items()
+            if key not in AREA_POLICIES
+        }
+
+
+# Looked up by area name at runtime, so never kept in config entries
+AREA_POLICIES = ("retry", "breaker", "rate_limit")
+
+
+@dataclass(frozen=True)
+class DailyReading:
+    """Describe the reading of one day, taken from an EVN daily series."""
+
+    day: date
+    index: float | None  # meter index at the end of the day
+    consumption: float  # in kWh
 
 
 @dataclass
@@ -79,6 +136,24 @@ class EVNSensorEntityDescription(SensorEntityDescription, EVNRequiredKeysMixin):
 
     dynamic_name: None | bool = False
     dynamic_icon: None | bool = False
+    source: str = SOURCE_CONSUMPTION
+
+
+@dataclass
+class EVNDiagnosticRequiredKeysMixin:
+    """Mixin for required keys of diagnostic sensors."""
+
+    source_fn: Callable[[Any], Any]
+    value_fn: Callable[[Any], Any]
+
+
+@dataclass
+class EVNDiagnosticEntityDescription(
+    SensorEntityDescription, EVNDiagnosticRequiredKeysMixin
+):
+    """Describes EVN diagnostic sensor entity, fed by area-wide state."""
+
+    attributes_fn: None | Callable[[Any], dict[str, Any]] = None
 
 
 VIETNAM_EVN_AREA = [
@@ -89,6 +164,7 @@ VIETNAM_EVN_AREA = [
         evn_data_url="https://evnhanoi.vn/api/TraCuu/LayChiSoDoXa",
         evn_payment_url="https://evnhanoi.vn/api/TraCuu/GetListThongTinNoKhachHang",
         pattern=["PD"],
+        rate_limit=RateLimitPolicy(rate=1.0, burst=4),
     ),
     Area(
         name=EVN_NAME.HCMC,
@@ -123,9 +199,20 @@ VIETNAM_EVN_AREA = [
         evn_payment_url="https://api.cskh.evnspc.vn/api/NghiepVu/TraCuuNoHoaDon",
         evn_loadshedding_url="https://api.cskh.evnspc.vn/api/NghiepVu/TraCuuLichNgungGiamCungCapDien",
         pattern=["PB", "PK"],
+        retry=RetryPolicy(attempts=4, budget=8),
     ),
 ]
 
+
+def get_evn_area(name: str) -> Area:
+    """Return the supported area with the given EVN name."""
+
+    for each_area in VIETNAM_EVN_AREA:
+        if each_area.name == name:
+            return each_area
+
+    return Area(name=name, supported=False)
+
 EVN_SENSORS: tuple[EVNSensorEntityDescription, ...] = (
     # Current day
     EVNSensorEntityDescription(
@@ -224,6 +311,7 @@ EVN_SENSORS: tuple[EVNSensorEntityDescription, ...] = (
         icon="mdi:comment-question-outline",
         value_fn=lambda data: data[ID_PAYMENT_NEEDED],
         dynamic_icon=True,
+        source=SOURCE_BILLING,
     ),
     EVNSensorEntityDescription(
         key=ID_M_PAYMENT_NEEDED,
@@ -232,6 +320,7 @@ EVN_SENSORS: tuple[EVNSensorEntityDescription, ...] = (
         native_unit_of_measurement="VNĐ",
         value_fn=lambda data: data[ID_M_PAYMENT_NEEDED],
         dynamic_icon=True,
+        source=SOURCE_BILLING,
     ),
     EVNSensorEntityDescription(
         key=ID_LOADSHEDDING,
@@ -239,5 +328,29 @@ EVN_SENSORS: tuple[EVNSensorEntityDescription, ...] = (
         icon="mdi:transmission-tower-off",
         value_fn=lambda data: data[ID_LOADSHEDDING],
         dynamic_icon=True,
+        source=SOURCE_BILLING,
+    ),
+)
+
+EVN_DIAGNOSTIC_SENSORS: tuple[EVNDiagnosticEntityDescription, ...] = (
+    EVNDiagnosticEntityDescription(
+        key=ID_CIRCUIT_BREAKER,
+        name="Trạng thái máy chủ",
+        icon="mdi:server-network",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        source_fn=lambda area: area.circuit_breaker,
+        value_fn=lambda breaker: breaker.state,
+        attributes_fn=lambda breaker: breaker.attributes,
+    ),
+    EVNDiagnosticEntityDescription(
+        key=ID_REQUEST_WAIT,
+        name="Thời gian chờ gửi yêu cầu",
+        icon="mdi:timer-sand",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        source_fn=lambda area: area.rate_limiter,
+        value_fn=lambda limiter: limiter.last_wait,
+        attributes_fn=lambda limiter: limiter.attributes,
     ),
 )
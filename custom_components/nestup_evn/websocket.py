@@ -0,0 +1,93 @@
+"""Websocket API serving the daily series of each customer ID."""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+import homeassistant.helpers.config_validation as cv
+
+from .account import async_get_account_registry
+from .const import (
+    CONF_CUSTOMER_ID,
+    DOMAIN,
+    SERIES_PAGE_SIZE,
+    SERIES_PAGE_SIZE_MAX,
+    SOURCE_CONSUMPTION,
+)
+
+
+@callback
+def async_setup_websocket(hass: HomeAssistant) -> None:
+    """Register the websocket commands of the integration."""
+    websocket_api.async_register_command(hass, ws_daily_series)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/daily_series",
+        vol.Required(CONF_CUSTOMER_ID): vol.All(cv.string, vol.Upper),
+        vol.Optional("start_date", default=date.min): cv.date,
+        vol.Optional("end_date", default=date.max): cv.date,
+        vol.Optional("limit", default=SERIES_PAGE_SIZE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=SERIES_PAGE_SIZE_MAX)
+        ),
+    }
+)
+@callback
+def ws_daily_series(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Send one page of the daily readings of a customer ID, column by column.
+
+    A page holds at most limit days from start_date on, next_date tells
+    where the following page starts when there is one.
+    """
+
+    customer_id = msg[CONF_CUSTOMER_ID]
+
+    if (account := async_get_account_registry(hass).get_customer(customer_id)) is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, f"Unknown customer ID {customer_id}"
+        )
+        return
+
+    if (
+        series := account.coordinators[SOURCE_CONSUMPTION].series.get(customer_id)
+    ) is None:
+        connection.send_result(msg["id"], _page([], [], [], None))
+        return
+
+    window = series.window(msg["start_date"], msg["end_date"])
+    page = slice(window.start, min(window.stop, window.start + msg["limit"]))
+
+    connection.send_result(
+        msg["id"],
+        _page(
+            [date.fromordinal(day).isoformat() for day in series.days[page]],
+            series.indexes[page].tolist(),
+            series.consumptions[page].tolist(),
+            (
+                date.fromordinal(series.days[page.stop]).isoformat()
+                if page.stop < window.stop
+                else None
+            ),
+        ),
+    )
+
+
+def _page(
+    days: list[str], indexes: list[float], consumptions: list[float], next_date
+) -> dict[str, Any]:
+    return {
+        "days": days,
+        "index": indexes,
+        "consumption": consumptions,
+        "next_date": next_date,
+    }